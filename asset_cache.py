@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from blend import premultiply
+
+
+class AssetCache:
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_held = 0
+
+    def get(self, path, size=None, reduce=1):
+        """Return the decoded RGBA image for a path, decoding it only on a cache miss.
+
+        reduce > 1 gives a proxy variant downscaled by that factor; size, if given,
+        is the final pixel size and is resized from the proxy variant.
+        """
+        return self._get(path, size, reduce)
+
+    def _get(self, path, size=None, reduce=1, count=True):
+        # count=False for the intermediate variants a single request builds on, so stats() sees one hit or miss
+        size = tuple(size) if size is not None else None
+        key = (os.path.abspath(path), os.path.getmtime(path), size, reduce)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry
+            if count:
+                self.misses += 1
+
+        if size is None and reduce > 1:
+            image = self._peek(path)
+            with Image.open(path) as source:
+                proxy_size = (-(-source.width // reduce), -(-source.height // reduce))
+                if image is None:
+                    source.draft("RGB", proxy_size)  # JPEGs can decode straight at (near) proxy scale
+                    image = source.convert("RGBA")
+            if image.size != proxy_size:
+                image = image.resize(proxy_size, Image.Resampling.BOX)
+        elif size is None:
+            image = Image.open(path).convert("RGBA")
+            image.load()
+        else:
+            image = self._get(path, reduce=reduce, count=False)
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+        self._store(key, image)
+        return image
+
+    def get_array(self, path, size=None, reduce=1, premultiplied=False):
+        """Return a cached read-only RGBA NumPy array of an image, optionally premultiplied."""
+        size = tuple(size) if size is not None else None
+        key = (os.path.abspath(path), os.path.getmtime(path), size, reduce,
+               "premultiplied" if premultiplied else "straight")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        array = np.asarray(self._get(path, size, reduce, count=False))
+        if premultiplied:
+            array = premultiply(array)
+        array.flags.writeable = False
+        self._store(key, array)
+        return array
+
+    def _peek(self, path):
+        """Full-resolution decode if it is already cached (without counting a hit or miss)."""
+        with self._lock:
+            return self._entries.get((os.path.abspath(path), os.path.getmtime(path), None, 1))
+
+    def _store(self, key, image):
+        """Insert a decoded image and evict least recently used entries over the byte budget."""
+        size = self._image_bytes(image)
+        with self._lock:
+            # Drop stale decodes of the same file (older mtime)
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1] != key[1]]:
+                self.bytes_held -= self._image_bytes(self._entries.pop(stale))
+            if key in self._entries:
+                return
+            self._entries[key] = image
+            self.bytes_held += size
+            while self.bytes_held > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes_held -= self._image_bytes(evicted)
+
+    def _image_bytes(self, image):
+        if isinstance(image, np.ndarray):
+            return image.nbytes
+        return image.width * image.height * len(image.getbands())
+
+    def clear(self):
+        """Drop every cached image."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes_held = 0
+
+    def stats(self):
+        """Report cache hits, misses and memory held."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.bytes_held,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from PIL import Image
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    category TEXT PRIMARY KEY,  -- '' is the library root
+    mtime REAL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    category TEXT,
+    name TEXT,
+    size INTEGER,
+    mtime REAL,
+    width INTEGER,
+    height INTEGER,
+    mode TEXT,
+    sha1 TEXT,
+    PRIMARY KEY (category, name)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    category TEXT,
+    name TEXT,
+    tag TEXT,
+    PRIMARY KEY (category, name, tag)
+);
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+"""
+
+
+def file_sha1(path):
+    """Content hash used to key assets and everything derived from them."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+ASSET_COLUMNS = ("category", "name", "size", "mtime", "width", "height", "mode", "sha1")
+INDEX_CACHE_DIR = "output/asset_index"  # Local disk; the library itself may be a read-only or network mount
+
+
+def default_db_path(library_path):
+    """Local index file for a library, keyed by the library's absolute path."""
+    digest = hashlib.sha1(os.path.abspath(library_path).encode("utf-8")).hexdigest()
+    return os.path.join(INDEX_CACHE_DIR, f"{digest}.sqlite")
+
+
+class AssetIndex:
+    def __init__(self, library_path, db_path=None, hash_contents=True):
+        self.library_path = library_path
+        self.db_path = db_path or default_db_path(library_path)
+        self.hash_contents = hash_contents
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # IMMEDIATE takes the write lock up front, so concurrent refreshes queue on the busy timeout
+        self._db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level="IMMEDIATE")
+        if db_path is None:
+            # WAL needs shared memory, which network filesystems don't provide; only use it on the local cache
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def refresh(self, categories=None, deep=False):
+        """Bring the index up to date, re-probing only files whose size or mtime changed.
+
+        Every file is stat'ed (a directory's mtime misses files rewritten in place),
+        but only new or changed ones are probed and hashed; pass deep=True to re-hash
+        every file regardless.
+        """
+        with self._lock, self._db:
+            if categories is None:
+                root_mtime = self._mtime(self.library_path)
+                if deep or self._stored_mtime("") != root_mtime:
+                    self._sync_categories(root_mtime)
+                categories = self.categories()
+
+            for category in categories:
+                path = os.path.join(self.library_path, category)
+                mtime = self._mtime(path) if os.path.isdir(path) else None
+                if mtime is None:
+                    self._forget(category)
+                else:
+                    self._scan(category, path, rehash=deep)
+                    if self._stored_mtime(category) != mtime:
+                        self._db.execute("INSERT OR REPLACE INTO directories VALUES (?, ?)", (category, mtime))
+
+    def categories(self):
+        with self._lock:
+            rows = self._db.execute("SELECT category FROM directories WHERE category != '' ORDER BY category")
+            return [category for category, in rows]
+
+    def list(self, category, extensions=None):
+        """Names of the assets in a category, optionally filtered by suffix."""
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM assets WHERE category = ? ORDER BY name", (category,))
+            names = [name for name, in rows]
+        if extensions:
+            names = [name for name in names if name.endswith(tuple(extensions))]
+        return names
+
+    def get(self, category, name):
+        """Metadata for one asset, or None."""
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(ASSET_COLUMNS)} FROM assets WHERE category = ? AND name = ?",
+                                   (category, name)).fetchone()
+        return dict(zip(ASSET_COLUMNS, row)) if row else None
+
+    def search(self, prefix=None, category=None, tag=None, extensions=None):
+        """Find assets by name prefix, category and/or tag."""
+        query = f"SELECT {', '.join('a.' + column for column in ASSET_COLUMNS)} FROM assets a"
+        clauses, params = [], []
+        if tag is not None:
+            query += " JOIN tags t ON t.category = a.category AND t.name = a.name"
+            clauses.append("t.tag = ?")
+            params.append(tag)
+        if category is not None:
+            clauses.append("a.category = ?")
+            params.append(category)
+        if prefix:
+            # Range scan on the primary key instead of LIKE, which can't use the index
+            clauses.append("a.name >= ? AND a.name < ?")
+            params += [prefix, prefix + "\U0010ffff"]
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY a.category, a.name"
+
+        with self._lock:
+            rows = [dict(zip(ASSET_COLUMNS, row)) for row in self._db.execute(query, params)]
+        if extensions:
+            rows = [row for row in rows if row["name"].endswith(tuple(extensions))]
+        return rows
+
+    def add_tags(self, category, name, *tags):
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?, ?)",
+                                 [(category, name, tag) for tag in tags])
+
+    def remove_tag(self, category, name, tag):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM tags WHERE category = ? AND name = ? AND tag = ?", (category, name, tag))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _sync_categories(self, root_mtime):
+        current = {entry.name for entry in os.scandir(self.library_path) if entry.is_dir()}
+        for category in set(self.categories()) - current:
+            self._forget(category)
+        for category in current - set(self.categories()):
+            self._db.execute("INSERT OR IGNORE INTO directories VALUES (?, NULL)", (category,))
+        self._db.execute("INSERT OR REPLACE INTO directories VALUES ('', ?)", (root_mtime,))
+
+    def _scan(self, category, path, rehash=False):
+        """Diff one directory against the index, probing only new or changed files (all of them if rehash)."""
+        known = {name: (size, mtime) for name, size, mtime in
+                 self._db.execute("SELECT name, size, mtime FROM assets WHERE category = ?", (category,))}
+        seen = set()
+        for entry in os.scandir(path):
+            if not entry.is_file():
+                continue
+            seen.add(entry.name)
+            stat = entry.stat()
+            if not rehash and known.get(entry.name) == (stat.st_size, stat.st_mtime):
+                continue
+            width, height, mode = self._probe(entry.path)
+            sha1 = file_sha1(entry.path) if self.hash_contents else None
+            self._db.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (category, entry.name, stat.st_size, stat.st_mtime, width, height, mode, sha1))
+
+        removed = [(category, name) for name in known.keys() - seen]
+        self._db.executemany("DELETE FROM assets WHERE category = ? AND name = ?", removed)
+        self._db.executemany("DELETE FROM tags WHERE category = ? AND name = ?", removed)
+
+    def _forget(self, category):
+        for table in ("directories", "assets", "tags"):
+            self._db.execute(f"DELETE FROM {table} WHERE category = ?", (category,))
+
+    def _stored_mtime(self, category):
+        row = self._db.execute("SELECT mtime FROM directories WHERE category = ?", (category,)).fetchone()
+        return row[0] if row else None
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _probe(self, path):
+        """Read dimensions and mode from the image header without decoding pixels."""
+        try:
+            with Image.open(path) as img:
+                return img.width, img.height, img.mode
+        except OSError:
+            return None, None, None  # Not an image (e.g. audio assets)
+
+# Example Usage
+if __name__ == "__main__":
+    index = AssetIndex("assets")
+    index.refresh()
+    print("Categories:", index.categories())
+    for category in index.categories():
+        print(category, index.list(category))
+    print("Backgrounds starting with 'f':", index.search(prefix="f", category="backgrounds"))
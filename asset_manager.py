@@ -1,15 +1,93 @@
 import os
-from PyQt6.QtGui import QPixmap
+import threading
+from PyQt6.QtCore import QObject, QSize, pyqtSignal
+from PyQt6.QtGui import QIcon, QImage, QPixmap
 from PyQt6.QtWidgets import QListWidget, QGraphicsPixmapItem
 
+from thumbnail_cache import ThumbnailCache
+
+
+class ThumbnailLoader(QObject):
+    """Generates thumbnails on a worker pool and delivers them to the GUI thread as QImages."""
+    loaded = pyqtSignal(int, str, QImage)  # request generation, asset name, thumbnail
+
+    def __init__(self, thumbnails, asset_index):
+        super().__init__()
+        self.thumbnails = thumbnails
+        self.asset_index = asset_index
+        self.generation = 0
+        self._pending = []
+        self._lock = threading.Lock()  # request() runs on the GUI thread, _refreshed on a worker
+
+    def request(self, category, names):
+        """Queue thumbnails for a category listing, cancelling any earlier listing still in flight.
+
+        The category's index refresh (probing and hashing new files) runs first on the
+        workers and the thumbnails are queued once it finishes, so they reuse its content
+        hashes and the GUI thread never waits.
+        """
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self.generation += 1
+            generation = self.generation
+            refresh = self.thumbnails.execute(self.asset_index.refresh, [category])
+            self._pending = [refresh]
+        refresh.add_done_callback(lambda f: self._refreshed(generation, category, names, f))
+        return generation
+
+    def _refreshed(self, generation, category, names, future):
+        # Runs on the worker that did the refresh
+        if future.cancelled():
+            return
+        if future.exception() is not None:  # Thumbnails still load, hashing the files themselves
+            print(f"Warning: Could not refresh the asset index - {future.exception()}")
+        with self._lock:
+            if generation != self.generation:
+                return  # A newer listing replaced this one while the index refreshed
+            for name in names:
+                future = self.thumbnails.execute(self._thumbnail, category, name)
+                future.add_done_callback(lambda f, name=name: self._deliver(generation, name, f))
+                self._pending.append(future)
+
+    def _thumbnail(self, category, name):
+        asset = self.asset_index.get(category, name)
+        source = os.path.join(self.asset_index.library_path, category, name)
+        digest = None
+        if asset and asset["sha1"]:
+            # The index may predate an in-place edit; only trust its hash if the file still matches
+            stat = os.stat(source)
+            if (stat.st_size, stat.st_mtime) == (asset["size"], asset["mtime"]):
+                digest = asset["sha1"]
+        return self.thumbnails.get(source, digest)
+
+    def _deliver(self, generation, name, future):
+        # Runs on the worker thread; QImage (unlike QPixmap) is safe to build here
+        if future.cancelled() or generation != self.generation:
+            return
+        if future.exception() is not None:
+            print(f"Warning: Could not create thumbnail for {name} - {future.exception()}")
+            return
+        image = QImage(future.result())
+        if not image.isNull():
+            self.loaded.emit(generation, name, image)  # Queued to the GUI thread
+
+
 class AssetManager:
-    def __init__(self, scene_generator, preview_scene):
+    def __init__(self, scene_generator, preview_scene, thumbnail_dir="output/thumbnails"):
         self.scene_generator = scene_generator
         self.preview_scene = preview_scene
+        self.current_category = None
+        self.thumbnails = ThumbnailCache(thumbnail_dir)
+        self.thumbnail_loader = ThumbnailLoader(self.thumbnails, scene_generator.asset_index)
+        self.thumbnail_loader.loaded.connect(self._set_thumbnail)
+        self._thumbnail_items = {}
 
     def populate_asset_categories(self, asset_list):
         """List asset categories in the library."""
         asset_list.clear()
+        self.current_category = None
+        self._thumbnail_items = {}
         asset_folders = ["backgrounds", "characters", "props", "audio"]
         for folder in asset_folders:
             if os.path.exists(os.path.join(self.scene_generator.asset_library_path, folder)):
@@ -18,14 +96,28 @@ class AssetManager:
     def load_asset_files(self, asset_list, item):
         """Show actual files inside the selected asset category."""
         category = item.text()
-        asset_path = os.path.join(self.scene_generator.asset_library_path, category)
+        self.current_category = category
 
         asset_list.clear()
         asset_list.addItem(".. (Back)")
+        asset_list.setIconSize(QSize(*self.thumbnails.size))
+
+        # A bare directory listing; probing and hashing new files happens on the thumbnail workers
+        path = os.path.join(self.scene_generator.asset_library_path, category)
+        files = sorted(entry.name for entry in os.scandir(path)
+                       if entry.is_file() and entry.name.endswith((".png", ".jpg", ".gif")))
+        self._thumbnail_items = {}
+        for file in files:
+            asset_list.addItem(file)
+            self._thumbnail_items[file] = asset_list.item(asset_list.count() - 1)
 
-        for file in os.listdir(asset_path):
-            if file.endswith((".png", ".jpg", ".gif")):
-                asset_list.addItem(file)
+        # Icons arrive asynchronously; the list is usable immediately
+        self.thumbnail_loader.request(category, files)
+
+    def _set_thumbnail(self, generation, name, image):
+        if generation != self.thumbnail_loader.generation or name not in self._thumbnail_items:
+            return  # The list has moved on to another category
+        self._thumbnail_items[name].setIcon(QIcon(QPixmap.fromImage(image)))
 
     def drop_asset_to_scene(self, asset_list):
         """Drop an asset into the animation preview scene."""
@@ -34,16 +126,18 @@ class AssetManager:
             return
 
         asset_name = selected_item.text()
-        category = asset_list.item(0).text()
 
         if asset_name == ".. (Back)":
             self.populate_asset_categories(asset_list)
             return
+        if self.current_category is None:
+            return
 
-        asset_path = os.path.join(self.scene_generator.asset_library_path, category, asset_name)
+        asset_path = os.path.join(self.scene_generator.asset_library_path, self.current_category, asset_name)
 
         if os.path.exists(asset_path):
-            pixmap = QPixmap(asset_path)
+            pixmap = QPixmap(asset_path)  # Full resolution only once the asset is actually placed
             item = QGraphicsPixmapItem(pixmap)
             item.setPos(100, 100)
             self.preview_scene.addItem(item)
+            return item
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+def decode_audio(path, sample_rate=None, channels=None):
+    """Decode an audio file into float32 samples shaped (frames, channels) in [-1, 1]."""
+    from pydub import AudioSegment  # pydub probes for ffmpeg on import, so only load it to decode
+
+    segment = AudioSegment.from_file(path)
+    if sample_rate and segment.frame_rate != sample_rate:
+        segment = segment.set_frame_rate(sample_rate)
+    if channels and segment.channels != channels:
+        segment = segment.set_channels(channels)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32).reshape(-1, segment.channels)
+    samples /= float(1 << (8 * segment.sample_width - 1))
+    return samples, segment.frame_rate
+
+
+def to_pcm16(samples):
+    """Convert float samples to interleaved little-endian 16-bit PCM bytes."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def encode_audio(samples, sample_rate, output_file, format="mp3"):
+    """Encode float samples to a file in a single pass."""
+    from pydub import AudioSegment
+
+    segment = AudioSegment(to_pcm16(samples), frame_rate=sample_rate, sample_width=2, channels=samples.shape[1])
+    segment.export(output_file, format=format)
+    return output_file
+
+
+def db_to_gain(db):
+    return 10 ** (db / 20)
+
+
+class AudioGraph:
+    """Records audio operations and runs them on one decoded buffer when rendered."""
+
+    def __init__(self, source):
+        self.source = source
+        self.operations = []
+
+    def trim(self, start_time, end_time):
+        """Keep the audio between start_time and end_time (in milliseconds)."""
+        self.operations.append(("trim", start_time, end_time))
+        return self
+
+    def fade(self, fade_in_duration=1000, fade_out_duration=1000):
+        """Linear fade in/out (in milliseconds)."""
+        self.operations.append(("fade", fade_in_duration, fade_out_duration))
+        return self
+
+    def gain(self, adjustment_db):
+        self.operations.append(("gain", adjustment_db))
+        return self
+
+    def overlay(self, other, gain_db=0, loop=False):
+        """Mix another file or graph over this one, truncated (or looped) to this length."""
+        self.operations.append(("overlay", other, gain_db, loop))
+        return self
+
+    def render(self, sample_rate=None, channels=None):
+        """Decode the source once and apply every recorded operation; returns (samples, sample_rate)."""
+        if isinstance(self.source, AudioGraph):
+            samples, rate = self.source.render(sample_rate, channels)
+        else:
+            samples, rate = decode_audio(self.source, sample_rate, channels)
+
+        for operation in self.operations:
+            name, args = operation[0], operation[1:]
+            samples = getattr(self, f"_apply_{name}")(samples, rate, *args)
+        return samples, rate
+
+    def export(self, output_file, format="mp3"):
+        """Render the graph and encode it once."""
+        samples, rate = self.render()
+        return encode_audio(samples, rate, output_file, format)
+
+    def _apply_trim(self, samples, rate, start_time, end_time):
+        return samples[int(start_time * rate / 1000):int(end_time * rate / 1000)]
+
+    def _apply_fade(self, samples, rate, fade_in_duration, fade_out_duration):
+        samples = samples.copy()
+        fade_in = min(int(fade_in_duration * rate / 1000), len(samples))
+        fade_out = min(int(fade_out_duration * rate / 1000), len(samples))
+        if fade_in:
+            samples[:fade_in] *= np.linspace(0.0, 1.0, fade_in, dtype=np.float32)[:, None]
+        if fade_out:
+            samples[len(samples) - fade_out:] *= np.linspace(1.0, 0.0, fade_out, dtype=np.float32)[:, None]
+        return samples
+
+    def _apply_gain(self, samples, rate, adjustment_db):
+        return samples * np.float32(db_to_gain(adjustment_db))
+
+    def _apply_overlay(self, samples, rate, other, gain_db, loop):
+        if isinstance(other, AudioGraph):
+            layer, _ = other.render(rate, samples.shape[1])
+        else:
+            layer, _ = decode_audio(other, rate, samples.shape[1])
+        if loop and 0 < len(layer) < len(samples):
+            layer = np.resize(layer, samples.shape)
+        length = min(len(layer), len(samples))
+        mixed = samples.copy()
+        mixed[:length] += layer[:length] * np.float32(db_to_gain(gain_db))
+        return mixed
+
+# Example Usage
+if __name__ == "__main__":
+    graph = AudioGraph("hello.mp3").trim(0, 2000).fade(500, 500).gain(-3)
+    graph.overlay("music_library/background.mp3", gain_db=-10, loop=True)
+    print(f"Processed Audio: {graph.export('processed.mp3')}")
@@ -1,55 +1,58 @@
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.playback import play
 import os
+import shutil
+
+from audio_graph import AudioGraph
+from audio_mixer import TimelineMixer
+from lip_sync import LipSyncAnalyzer
+from speech_synthesis import SpeechSynthesizer
 
 class AudioIntegration:
-    def __init__(self, music_library_path="music_library"):
+    def __init__(self, music_library_path="music_library", tts_backend=None, tts_cache_dir="output/tts_cache",
+                 tts_workers=4):
         self.music_library_path = music_library_path
         if not os.path.exists(self.music_library_path):
             os.makedirs(self.music_library_path)
+        self.synthesizer = SpeechSynthesizer(tts_backend, tts_cache_dir, tts_workers)
+        self.mixer = TimelineMixer()
+        self.lip_sync_analyzer = LipSyncAnalyzer()
 
-    def generate_tts_audio(self, text, language='en', accent=None, output_file="output_audio.mp3"):
+    def generate_tts_audio(self, text, language='en', accent=None, output_file=None):
         """Generate TTS audio with support for multiple languages and accents."""
-        tts = gTTS(text=text, lang=language, tld=accent if accent else "com")
-        tts.save(output_file)
-        print(f"Generated TTS Audio: {output_file}")
-        return output_file
+        audio_file = self.synthesizer.synthesize(text, language, accent)
+        if output_file:
+            shutil.copyfile(audio_file, output_file)
+            audio_file = output_file
+        print(f"Generated TTS Audio: {audio_file}")
+        return audio_file
 
-    def add_background_music(self, audio_file, music_file, output_file="output_with_music.mp3", volume_adjustment=-10):
-        """Combine TTS audio with background music."""
-        tts_audio = AudioSegment.from_file(audio_file)
-        background_music = AudioSegment.from_file(music_file).apply_gain(volume_adjustment)
+    def generate_tts_batch(self, lines, language='en', accent=None):
+        """Synthesize all dialogue lines concurrently, reusing cached audio for unchanged lines."""
+        return self.synthesizer.synthesize_batch(lines, language, accent)
 
-        # Loop background music to match the TTS duration
-        if len(background_music) < len(tts_audio):
-            background_music = background_music * (len(tts_audio) // len(background_music) + 1)
+    def process(self, audio_file):
+        """Start a lazy chain of edits; nothing is decoded until export()."""
+        return AudioGraph(audio_file)
 
-        # Combine the audio
-        combined = tts_audio.overlay(background_music[:len(tts_audio)])
-        combined.export(output_file, format="mp3")
-        return output_file
+    def add_background_music(self, audio_file, music_file, output_file="output_with_music.mp3", volume_adjustment=-10):
+        """Combine TTS audio with background music."""
+        # Background music loops to match the TTS duration
+        return self.process(audio_file).overlay(music_file, volume_adjustment, loop=True).export(output_file)
 
     def trim_audio(self, audio_file, start_time, end_time, output_file="trimmed_audio.mp3"):
         """Trim an audio file between start_time and end_time (in milliseconds)."""
-        audio = AudioSegment.from_file(audio_file)
-        trimmed = audio[start_time:end_time]
-        trimmed.export(output_file, format="mp3")
-        return output_file
+        return self.process(audio_file).trim(start_time, end_time).export(output_file)
 
     def fade_audio(self, audio_file, fade_in_duration=1000, fade_out_duration=1000, output_file="faded_audio.mp3"):
         """Apply fade in/out effects to an audio file."""
-        audio = AudioSegment.from_file(audio_file)
-        faded = audio.fade_in(fade_in_duration).fade_out(fade_out_duration)
-        faded.export(output_file, format="mp3")
-        return output_file
+        return self.process(audio_file).fade(fade_in_duration, fade_out_duration).export(output_file)
 
     def adjust_volume(self, audio_file, adjustment_db, output_file="adjusted_volume_audio.mp3"):
         """Adjust the volume of an audio file."""
-        audio = AudioSegment.from_file(audio_file)
-        adjusted = audio.apply_gain(adjustment_db)
-        adjusted.export(output_file, format="mp3")
-        return output_file
+        return self.process(audio_file).gain(adjustment_db).export(output_file)
+
+    def mix_timeline(self, timeline_editor, output_file="output/audio/final_audio.mp3", duration=None):
+        """Mix every dialogue, SFX and music cue on the timeline into the final soundtrack."""
+        return self.mixer.mix_timeline(timeline_editor, output_file, duration)
 
     def list_music_library(self):
         """List all available background music files in the library."""
@@ -59,21 +62,15 @@ class AudioIntegration:
         """Convert an audio file to a different format (e.g., MP3 to WAV)."""
         if not output_file:
             output_file = input_file.rsplit('.', 1)[0] + f".{output_format}"
-        audio = AudioSegment.from_file(input_file)
-        audio.export(output_file, format=output_format)
-        return output_file
+        return self.process(input_file).export(output_file, format=output_format)
 
-    def lip_sync(self, audio_file, character_name):
-        """Simulate lip-syncing by generating a phoneme timeline for mouth movements."""
-        # Placeholder: Generate a simple phoneme timeline
+    def lip_sync(self, audio_file, character_name, timeline_editor=None, offset=0):
+        """Generate a viseme timeline for mouth movements from the audio itself."""
         print(f"Generating lip sync for {character_name} using {audio_file}...")
-        # A real implementation would analyze the audio and map phonemes to timestamps.
-        phoneme_timeline = [
-            {"time": 0, "phoneme": "ah"},
-            {"time": 500, "phoneme": "oo"},
-            {"time": 1000, "phoneme": "ee"}
-        ]
-        print(f"Phoneme timeline: {phoneme_timeline}")
+        phoneme_timeline = self.lip_sync_analyzer.analyze(audio_file)
+        if timeline_editor is not None:
+            self.lip_sync_analyzer.apply_to_timeline(phoneme_timeline, timeline_editor, character_name, offset)
+        print(f"Phoneme timeline: {len(phoneme_timeline)} mouth shape changes")
         return phoneme_timeline
 
 # Example Usage
@@ -105,6 +102,10 @@ if __name__ == "__main__":
     music_files = audio_tool.list_music_library()
     print("Available Music Files:", music_files)
 
+    # Chain several edits with a single decode and a single encode
+    edited_audio = audio_tool.process(tts_audio).trim(0, 2000).fade(500, 500).gain(-5).export("edited_audio.mp3")
+    print(f"Edited Audio: {edited_audio}")
+
     # Convert audio format
     converted_audio = audio_tool.convert_audio_format(tts_audio, output_format="wav")
     print(f"Converted Audio: {converted_audio}")
@@ -0,0 +1,133 @@
+import os
+import subprocess
+import wave
+
+import numpy as np
+
+from audio_graph import db_to_gain, decode_audio, to_pcm16
+
+
+class TimelineMixer:
+    def __init__(self, sample_rate=44100, channels=2, chunk_seconds=1.0, ffmpeg_path="ffmpeg"):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.chunk_frames = int(chunk_seconds * sample_rate)
+        self.ffmpeg_path = ffmpeg_path
+
+    def mix_timeline(self, timeline_editor, output_file, duration=None, format=None):
+        """Mix every audio cue on the timeline into one file."""
+        return self.mix(timeline_editor.get_audio_cues(), output_file, duration, format)
+
+    def mix(self, cues, output_file, duration=None, format=None):
+        """Render cues chunk by chunk into output_file.
+
+        Each cue is a dict with "file" and "start" (seconds) plus optional "gain_db",
+        "fade_in"/"fade_out" (seconds), "loop" and "duration" (seconds; required to loop).
+        Only the decoded source clips and one chunk buffer are held in memory.
+        """
+        sources = {}
+        placed = []
+        for cue in sorted(cues, key=lambda c: c["start"]):
+            if cue["file"] not in sources:
+                sources[cue["file"]] = decode_audio(cue["file"], self.sample_rate, self.channels)[0]
+            placed.append(self._place(cue, sources[cue["file"]]))
+
+        total = int(round(duration * self.sample_rate)) if duration is not None else max(
+            (start + length for start, length, *_ in placed), default=0)
+        format = (format or os.path.splitext(output_file)[1].lstrip(".") or "wav").lower()
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+
+        with self._open_writer(output_file, format) as write:
+            next_cue = 0
+            active = []
+            for chunk_start in range(0, total, self.chunk_frames):
+                chunk_end = min(chunk_start + self.chunk_frames, total)
+                while next_cue < len(placed) and placed[next_cue][0] < chunk_end:
+                    active.append(placed[next_cue])
+                    next_cue += 1
+                active = [cue for cue in active if cue[0] + cue[1] > chunk_start]
+
+                chunk = np.zeros((chunk_end - chunk_start, self.channels), dtype=np.float32)
+                for cue in active:
+                    self._mix_into(chunk, chunk_start, chunk_end, *cue)
+                write(to_pcm16(chunk))
+        return output_file
+
+    def _place(self, cue, source):
+        """Resolve a cue to (start frame, length, source, gain, fade-in frames, fade-out frames, loop)."""
+        rate = self.sample_rate
+        loop = cue.get("loop", False) and len(source) > 0
+        if cue.get("duration") is not None:
+            length = int(round(cue["duration"] * rate))
+            if not loop:
+                length = min(length, len(source))
+        else:
+            length = len(source)
+        return (int(round(cue["start"] * rate)), length, source, db_to_gain(cue.get("gain_db", 0)),
+                int(cue.get("fade_in", 0) * rate), int(cue.get("fade_out", 0) * rate), loop)
+
+    def _mix_into(self, chunk, chunk_start, chunk_end, start, length, source, gain, fade_in, fade_out, loop):
+        lo = max(chunk_start, start) - start
+        hi = min(chunk_end, start + length) - start
+        if hi <= lo:
+            return
+        if loop:
+            segment = np.take(source, np.arange(lo, hi), axis=0, mode="wrap")
+        else:
+            segment = source[lo:hi]
+
+        envelope = np.full(hi - lo, gain, dtype=np.float32)
+        if fade_in or fade_out:
+            position = np.arange(lo, hi, dtype=np.float32)
+            if fade_in:
+                envelope *= np.minimum(position / fade_in, 1.0)
+            if fade_out:
+                envelope *= np.minimum((length - position) / fade_out, 1.0)
+        offset = start + lo - chunk_start
+        chunk[offset:offset + hi - lo] += segment * envelope[:, None]
+
+    def _open_writer(self, output_file, format):
+        if format == "wav":
+            return _WaveWriter(output_file, self.sample_rate, self.channels)
+        return _FFmpegWriter(self.ffmpeg_path, output_file, self.sample_rate, self.channels)
+
+
+class _WaveWriter:
+    def __init__(self, output_file, sample_rate, channels):
+        self.file = wave.open(output_file, "wb")
+        self.file.setnchannels(channels)
+        self.file.setsampwidth(2)
+        self.file.setframerate(sample_rate)
+
+    def __enter__(self):
+        return self.file.writeframes
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+class _FFmpegWriter:
+    """Streams 16-bit PCM chunks to ffmpeg for compressed formats such as MP3."""
+
+    def __init__(self, ffmpeg_path, output_file, sample_rate, channels):
+        self.process = subprocess.Popen(
+            [ffmpeg_path, "-y", "-loglevel", "error", "-f", "s16le", "-ar", str(sample_rate),
+             "-ac", str(channels), "-i", "-", output_file],
+            stdin=subprocess.PIPE)
+
+    def __enter__(self):
+        return self.process.stdin.write
+
+    def __exit__(self, *exc):
+        self.process.stdin.close()
+        if self.process.wait() != 0 and exc[0] is None:
+            raise RuntimeError(f"ffmpeg failed with exit code {self.process.returncode}")
+
+# Example Usage
+if __name__ == "__main__":
+    cues = [
+        {"file": "music_library/background.mp3", "start": 0, "gain_db": -12, "loop": True,
+         "duration": 30, "fade_in": 2, "fade_out": 3},
+        {"file": "hello.mp3", "start": 1.5},
+    ]
+    print(f"Mixed Audio: {TimelineMixer().mix(cues, 'output/audio/final_audio.wav')}")
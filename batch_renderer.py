@@ -0,0 +1,240 @@
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from script_parser import ScriptParser
+
+# Words in an action description that map onto a motion preset
+MOTION_KEYWORDS = {
+    "walk": "walk", "walks": "walk", "run": "walk", "runs": "walk", "enter": "walk", "enters": "walk",
+    "jump": "jump", "jumps": "jump", "leap": "jump", "leaps": "jump",
+    "bounce": "bounce", "bounces": "bounce", "zigzag": "zigzag", "dodge": "zigzag", "dodges": "zigzag",
+    "spin": "rotate", "spins": "rotate", "rotate": "rotate", "rotates": "rotate", "turn": "rotate", "turns": "rotate",
+    "grow": "scale", "grows": "scale", "shrink": "scale", "shrinks": "scale",
+}
+MOTION_SECONDS = 2  # Length of one repetition of a motion
+
+# The parser's greedy patterns leave "(Style: ...)" and "-> Repeat N times" inside the captured text
+SCENE_METADATA = re.compile(r"^(.*?)\s*\((.*)\)\s*$")
+REPEAT_SUFFIX = re.compile(r"^(.*?)\s*->\s*Repeat (\d+) times\s*$", re.IGNORECASE)
+
+_worker = {}
+
+
+def _init_worker(asset_library_path, tts_backend, resolution):
+    _worker.update(asset_library_path=asset_library_path, tts_backend=tts_backend, resolution=resolution)
+
+
+def _component(name):
+    """Build each worker's generators on first use, so a worker only imports what its jobs need."""
+    if name not in _worker:
+        if name == "scenes":
+            from scene_generator import SceneGenerator
+            _worker[name] = SceneGenerator(_worker["asset_library_path"])
+        elif name == "motion":
+            from motion_automation import MotionAutomation
+            _worker[name] = MotionAutomation()
+        elif name == "audio":
+            from audio_integration import AudioIntegration
+            backend = None
+            if _worker["tts_backend"] == "espeak":
+                from speech_synthesis import EspeakBackend
+                backend = EspeakBackend()
+            _worker[name] = AudioIntegration(tts_backend=backend)
+    return _worker[name]
+
+
+def _run_job(job):
+    """Execute one render job in a worker process and return its output."""
+    if job["kind"] == "scene":
+        return _component("scenes").generate_scene(job["name"], job["style"], tuple(_worker["resolution"]))
+    if job["kind"] == "motion":
+        return _component("motion").apply_motion(job["character"], job["motion"], job["duration"],
+                                                    output_file=job["output"])
+    if job["kind"] == "audio":
+        return _component("audio").generate_tts_batch(job["lines"], job.get("language", "en"))
+    raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+def expand_script(commands, episode):
+    """Turn parsed script commands into scene, motion and audio jobs with stable ids."""
+    jobs = []
+    scene_index = -1
+    scene_key = f"{episode}_intro"
+    character = None
+    narration = []
+
+    def flush_narration():
+        if narration:
+            jobs.append({"id": f"{scene_key}:audio", "kind": "audio", "lines": list(narration)})
+            narration.clear()
+
+    for command in commands:
+        kind = command["type"]
+        if kind == "scene":
+            flush_narration()
+            scene_index += 1
+            scene_key = f"{episode}_{scene_index:03d}"
+            character = None
+            name, metadata = _scene_name_and_metadata(command)
+            jobs.append({"id": f"{scene_key}:scene", "kind": "scene",
+                         "style": metadata.get("style", "realistic").lower(), "name": f"{scene_key}_{name}"})
+        elif kind == "character":
+            character = command["name"]
+            jobs.append(_motion_job(scene_key, len(jobs), character, "walk", 1))
+        elif kind in ("action", "conditional_action"):
+            description = command["description"] if kind == "action" else command["action"]
+            repeat = command.get("repeat", 1)
+            suffix = REPEAT_SUFFIX.match(description)
+            if suffix:
+                description, repeat = suffix.group(1), int(suffix.group(2))
+            narration.append(description)
+            motion = _motion_for(description)
+            if motion and character:
+                jobs.append(_motion_job(scene_key, len(jobs), character, motion, repeat))
+        elif kind == "simultaneous":
+            narration.extend(command["actions"])
+    flush_narration()
+    return jobs
+
+
+def _scene_name_and_metadata(command):
+    name, metadata = command["name"], dict(command["metadata"])
+    inline = SCENE_METADATA.match(name)
+    if inline and not metadata:
+        name = inline.group(1)
+        for item in inline.group(2).split(","):
+            key, _, value = item.partition(":")
+            if value:
+                metadata[key.strip().lower()] = value.strip()
+    return name, metadata
+
+
+def _motion_for(description):
+    for word in re.findall(r"[a-z]+", description.lower()):
+        if word in MOTION_KEYWORDS:
+            return MOTION_KEYWORDS[word]
+    return None
+
+
+def _motion_job(scene_key, index, character, motion, repeat):
+    return {"id": f"{scene_key}:motion:{index:04d}", "kind": "motion", "motion": motion, "actor": character,
+            "character": f"{scene_key}_{character}", "duration": MOTION_SECONDS * repeat,
+            # One file per job: a character repeating a motion in a scene must not race on one GIF
+            "output": f"output/motion/{scene_key}_{character}_{motion}_{index:04d}.gif"}
+
+
+class BatchRenderer:
+    """Runs render jobs for whole scripts on a process pool, checkpointing each finished job.
+
+    The checkpoint is an append-only JSONL file; re-running the same batch skips
+    every job already recorded as done (whose output still exists), so an
+    interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, checkpoint_file="output/batch/checkpoint.jsonl", workers=None, asset_library_path="assets",
+                 tts_backend=None, resolution=(1920, 1080)):
+        self.checkpoint_file = checkpoint_file
+        self.workers = workers or os.cpu_count() or 1
+        self.asset_library_path = asset_library_path
+        self.tts_backend = tts_backend  # "gtts" (default) or "espeak"; a name so it can cross processes
+        self.resolution = tuple(resolution)
+        os.makedirs(os.path.dirname(checkpoint_file) or ".", exist_ok=True)
+
+    def plan(self, source, language='en'):
+        """Expand a script string, script file or folder of *.txt scripts into jobs."""
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, "*.txt")))
+        elif os.path.isfile(source):
+            paths = [source]
+        else:
+            return expand_script(ScriptParser().parse_script(source, language), "script")
+
+        jobs = []
+        for path in paths:
+            parser = ScriptParser()
+            with open(path, encoding="utf-8") as f:
+                commands = list(parser.iter_parse(f, language))
+            for error in parser.get_errors():
+                print(f"Warning: {os.path.basename(path)}: {error}")
+            jobs.extend(expand_script(commands, os.path.splitext(os.path.basename(path))[0]))
+        return jobs
+
+    def completed(self):
+        """Ids of jobs the checkpoint records as done."""
+        done = {}
+        if not os.path.exists(self.checkpoint_file):
+            return set()
+        with open(self.checkpoint_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash mid-write
+                if record["status"] == "done":
+                    done[record["id"]] = record.get("output")
+                else:
+                    done.pop(record["id"], None)
+        return {job_id for job_id, output in done.items() if self._output_exists(output)}
+
+    def run(self, jobs, progress=None):
+        """Run every job not already checkpointed; returns counts of done, skipped and failed jobs."""
+        progress = progress or self._print_progress
+        completed = self.completed()
+        pending = [job for job in jobs if job["id"] not in completed]
+        summary = {"done": 0, "skipped": len(jobs) - len(pending), "failed": 0}
+        if not pending:
+            return summary
+
+        queue = iter(pending)
+        started = time.perf_counter()
+        with open(self.checkpoint_file, "a", encoding="utf-8") as checkpoint, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                    initargs=(self.asset_library_path, self.tts_backend, self.resolution)) as pool:
+            in_flight = {}
+            while True:
+                # Keep a bounded window of submitted jobs so huge batches don't flood the pool
+                while len(in_flight) < self.workers * 2:
+                    job = next(queue, None)
+                    if job is None:
+                        break
+                    in_flight[pool.submit(_run_job, job)] = job
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = in_flight.pop(future)
+                    try:
+                        record = {"id": job["id"], "status": "done", "output": future.result()}
+                        summary["done"] += 1
+                    except Exception as e:  # One bad job must not sink an overnight batch
+                        record = {"id": job["id"], "status": "failed", "error": str(e)}
+                        summary["failed"] += 1
+                    checkpoint.write(json.dumps(record) + "\n")
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
+                    progress(record, summary["done"] + summary["failed"], len(pending),
+                             time.perf_counter() - started)
+        return summary
+
+    def _output_exists(self, output):
+        if isinstance(output, str):
+            return os.path.exists(output)
+        if isinstance(output, list):
+            return all(self._output_exists(item) for item in output)
+        return True
+
+    def _print_progress(self, record, finished, total, elapsed):
+        status = "failed: " + record["error"] if record["status"] == "failed" else "done"
+        print(f"[{finished}/{total}] {record['id']} {status} ({elapsed:.1f}s)")
+
+# Example Usage
+if __name__ == "__main__":
+    renderer = BatchRenderer(workers=4)
+    jobs = renderer.plan("scripts")
+    print(f"Planned {len(jobs)} jobs")
+    print(renderer.run(jobs))
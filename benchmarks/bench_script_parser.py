@@ -0,0 +1,57 @@
+"""Compare ScriptParser throughput (lines/sec): regex cascade vs. keyword dispatch vs. streaming."""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_parser import ScriptParser
+
+SAMPLE_LINES = [
+    "Scene: Battlefield (Duration: 15s, Style: Realistic)",
+    "Character: Soldier enters from right",
+    "Action: Shoot -> Repeat 3 times",
+    "If: Enemy appears, then Action: Take cover",
+    "Simultaneous: Soldier shoots, Enemy fires back",
+    "Narrator whispers something unexpected",
+    "",
+]
+
+
+def build_script(line_count):
+    lines = (SAMPLE_LINES * (line_count // len(SAMPLE_LINES) + 1))[:line_count]
+    return "\n".join(lines)
+
+
+def measure(label, line_count, parse, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {line_count / best:>14,.0f} lines/sec")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    script = build_script(args.lines)
+    old, new = ScriptParser(), ScriptParser()
+
+    expected = measure("parse_script_old", args.lines, lambda: old.parse_script_old(script), args.repeat)
+    actual = measure("parse_script", args.lines, lambda: new.parse_script(script), args.repeat)
+    measure("iter_parse (streaming)", args.lines,
+            lambda: sum(1 for _ in new.iter_parse(io.StringIO(script))), args.repeat)
+
+    if actual != expected or new.get_errors() != old.get_errors():
+        sys.exit("Parsers disagree on the benchmark script")
+
+
+if __name__ == "__main__":
+    main()
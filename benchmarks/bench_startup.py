@@ -0,0 +1,111 @@
+"""Measure GUI startup: per-module import time and AnimationTool() construction, failing on regressions.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+Besides the time budgets, optional heavy dependencies (matplotlib, pydub, gTTS,
+OpenCV, ffmpeg-python) must not be imported until first use.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import budgets in milliseconds (best of --repeat runs)
+MODULE_BUDGETS = {
+    "script_parser": 30,
+    "render_cli": 60,
+    "motion_automation": 250,
+    "timeline_editor": 250,
+    "audio_integration": 250,
+    "scene_generator": 300,
+    "playback_engine": 400,
+    "main": 600,
+}
+CONSTRUCT_BUDGET = 300  # AnimationTool() with the QApplication already running
+LAZY_MODULES = ("matplotlib", "pydub", "gtts", "cv2", "ffmpeg")
+# Modules that specific imports must not drag in (the timeline only needs NumPy until it samples a motion)
+MODULE_LAZY = {"timeline_editor": ("motion_automation", "sprite_writer", "PIL")}
+
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+CONSTRUCT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+start = time.perf_counter()
+from main import AnimationTool
+imported = time.perf_counter()
+window = AnimationTool()
+built = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "ms": (built - imported) * 1000,
+                  "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(code, cwd):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def best_of(code, cwd, repeat):
+    runs = [probe(code, cwd) for _ in range(repeat)]
+    return min(runs, key=lambda run: run["ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument("--modules", nargs="*", default=list(MODULE_BUDGETS))
+    args = parser.parse_args()
+
+    failures = []
+    # AnimationTool creates its asset, music and output folders in the working directory
+    with tempfile.TemporaryDirectory() as cwd:
+        for module in args.modules:
+            budget = MODULE_BUDGETS.get(module, 300) * args.budget_scale
+            try:
+                lazy = LAZY_MODULES + MODULE_LAZY.get(module, ())
+                run = best_of(IMPORT_PROBE.format(root=ROOT, module=module, lazy=lazy), cwd, args.repeat)
+            except RuntimeError as e:
+                print(f"import {module:<22} skipped ({e})")
+                continue
+            print(f"import {module:<22} {run['ms']:>8.1f} ms  (budget {budget:.0f} ms)")
+            if run["ms"] > budget:
+                failures.append(f"import {module} took {run['ms']:.1f} ms")
+            if run["loaded"]:
+                failures.append(f"import {module} eagerly loaded {', '.join(run['loaded'])}")
+
+        budget = CONSTRUCT_BUDGET * args.budget_scale
+        try:
+            run = best_of(CONSTRUCT_PROBE.format(root=ROOT, lazy=LAZY_MODULES), cwd, args.repeat)
+        except RuntimeError as e:
+            print(f"AnimationTool() skipped ({e})")
+        else:
+            print(f"{'AnimationTool()':<29} {run['ms']:>8.1f} ms  (budget {budget:.0f} ms, "
+                  f"import main {run['import_ms']:.1f} ms)")
+            if run["ms"] > budget:
+                failures.append(f"AnimationTool() took {run['ms']:.1f} ms")
+            if run["loaded"]:
+                failures.append(f"AnimationTool() eagerly loaded {', '.join(run['loaded'])}")
+
+    if failures:
+        sys.exit("Startup regressions:\n  " + "\n  ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
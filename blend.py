@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BLEND_MODES = ("normal", "multiply", "screen", "add")
+
+
+def premultiply(rgba):
+    """Straight-alpha uint8/uint16 RGBA array -> premultiplied array of the same dtype."""
+    rgba = np.asarray(rgba)
+    scale = np.iinfo(rgba.dtype).max
+    out = rgba.copy()
+    alpha = rgba[..., 3:4].astype(np.uint32)
+    if alpha.min(initial=scale) < scale:
+        out[..., :3] = (rgba[..., :3].astype(np.uint32) * alpha + scale // 2) // scale
+    return out
+
+
+def unpremultiply(premultiplied, out=None):
+    """Premultiplied RGBA array -> straight alpha (written to out if given)."""
+    premultiplied = np.asarray(premultiplied)
+    scale = np.iinfo(premultiplied.dtype).max
+    if out is None:
+        out = premultiplied.copy()
+    elif out is not premultiplied:
+        out[...] = premultiplied
+    alpha = premultiplied[..., 3:4].astype(np.uint32)
+    if alpha.min(initial=scale) < scale:
+        color = premultiplied[..., :3].astype(np.uint32) * scale + alpha // 2
+        color //= np.maximum(alpha, 1)
+        out[..., :3] = np.minimum(color, scale)
+    return out
+
+
+def composite(dst, layers, source=None, region=None, chunk_rows=128, workers=1):
+    """Blend N premultiplied layers over dst in one pass; returns the rectangles written.
+
+    dst is a premultiplied (H, W, 4) uint8 or uint16 array, modified in place.
+    layers are (array, (x, y), mode, opacity) tuples; mode and opacity are optional.
+    source, if given, supplies the destination pixels instead of dst (so a cached
+    base can stay untouched), and region (x0, y0, x1, y1) limits the blend.
+    Work is split into bands of chunk_rows; NumPy releases the GIL inside each
+    band, so workers > 1 blends bands on threads.
+    """
+    height, width = dst.shape[:2]
+    rx0, ry0, rx1, ry1 = region if region is not None else (0, 0, width, height)
+    rx0, ry0, rx1, ry1 = max(rx0, 0), max(ry0, 0), min(rx1, width), min(ry1, height)
+
+    placed = []
+    for layer in layers:
+        array, (x, y) = layer[0], layer[1]
+        mode = layer[2] if len(layer) > 2 else "normal"
+        opacity = layer[3] if len(layer) > 3 else 1.0
+        if mode not in BLEND_MODES:
+            raise ValueError(f"Unsupported blend mode: {mode}")
+        x0, y0 = max(x, rx0), max(y, ry0)
+        x1, y1 = min(x + array.shape[1], rx1), min(y + array.shape[0], ry1)
+        if x0 < x1 and y0 < y1 and opacity > 0:
+            placed.append((array, x, y, x0, y0, x1, y1, mode, opacity))
+    if not placed:
+        return []
+
+    top, bottom = min(p[4] for p in placed), max(p[6] for p in placed)
+    bands = [(r0, min(r0 + chunk_rows, bottom)) for r0 in range(top, bottom, chunk_rows)]
+    source = dst if source is None else source
+    scale = float(np.iinfo(dst.dtype).max)
+
+    def blend_band(band):
+        r0, r1 = band
+        active = [p for p in placed if p[4] < r1 and p[6] > r0]
+        if not active:
+            return None
+        c0, c1 = min(p[3] for p in active), max(p[5] for p in active)
+        canvas = source[r0:r1, c0:c1].astype(np.float32)
+        canvas *= 1 / scale
+        for array, x, y, x0, y0, x1, y1, mode, opacity in active:
+            top_row, bottom_row = max(y0, r0), min(y1, r1)
+            target = canvas[top_row - r0:bottom_row - r0, x0 - c0:x1 - c0]
+            layer = array[top_row - y:bottom_row - y, x0 - x:x1 - x].astype(np.float32)
+            layer *= opacity / scale
+            _BLENDS[mode](target, layer)
+        canvas *= scale
+        canvas += 0.5
+        np.clip(canvas, 0, scale, out=canvas)
+        dst[r0:r1, c0:c1] = canvas.astype(dst.dtype)  # Truncating the +0.5 rounds to nearest
+        return (c0, r0, c1, r1)
+
+    if workers > 1 and len(bands) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            written = list(pool.map(blend_band, bands))
+    else:
+        written = [blend_band(band) for band in bands]
+    return [rect for rect in written if rect is not None]
+
+
+def _normal(d, s):
+    d *= 1 - s[..., 3:4]
+    d += s
+
+
+def _multiply(d, s):
+    sa, da = s[..., 3:4], d[..., 3:4].copy()
+    color = d[..., :3]
+    color *= s[..., :3] + (1 - sa)
+    color += s[..., :3] * (1 - da)
+    d[..., 3:4] = sa + da - sa * da
+
+
+def _screen(d, s):
+    d += s * (1 - d)  # Also gives the usual alpha union for the alpha channel
+
+
+def _add(d, s):
+    d += s
+    np.minimum(d, 1, out=d)
+
+
+_BLENDS = {"normal": _normal, "multiply": _multiply, "screen": _screen, "add": _add}
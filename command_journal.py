@@ -0,0 +1,183 @@
+import sys
+import time
+from collections import deque
+
+
+def _estimate_size(value):
+    """Rough memory footprint of a command payload (one level deep)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class Command:
+    """An undoable edit that stores just enough state to invert itself."""
+
+    def apply(self, editor):
+        raise NotImplementedError
+
+    def revert(self, editor):
+        raise NotImplementedError
+
+    def merge(self, other):
+        """Fold a following command into this one; return True if merged."""
+        return False
+
+    def size(self):
+        return sys.getsizeof(self) + sum(_estimate_size(v) for v in vars(self).values())
+
+
+class AddEvent(Command):
+    def __init__(self, timestamp, event, group=None):
+        self.timestamp = timestamp
+        self.event = event
+        self.group = group
+
+    def apply(self, editor):
+        editor.events.add(self.timestamp, self.event)
+        if self.group:
+            editor.event_groups[self.group].append({"timestamp": self.timestamp, "event": self.event})
+
+    def revert(self, editor):
+        editor.events.remove(self.timestamp, self.event)
+        if self.group:
+            editor.event_groups[self.group].remove({"timestamp": self.timestamp, "event": self.event})
+
+
+class RemoveEvent(AddEvent):
+    def apply(self, editor):
+        AddEvent.revert(self, editor)
+
+    def revert(self, editor):
+        AddEvent.apply(self, editor)
+
+
+class GroupEvents(Command):
+    def __init__(self, group_name, events):
+        self.group_name = group_name
+        self.events = list(events)
+
+    def apply(self, editor):
+        editor.event_groups[self.group_name].extend(self.events)
+
+    def revert(self, editor):
+        group = editor.event_groups[self.group_name]
+        del group[len(group) - len(self.events):]
+        if not group:
+            del editor.event_groups[self.group_name]
+
+
+class UngroupEvents(Command):
+    def __init__(self, group_name, events):
+        self.group_name = group_name
+        self.events = events
+
+    def apply(self, editor):
+        editor.event_groups.pop(self.group_name, None)
+
+    def revert(self, editor):
+        editor.event_groups[self.group_name] = self.events
+
+
+class MoveEvent(Command):
+    def __init__(self, timestamp, new_timestamp, event):
+        self.timestamp = timestamp
+        self.new_timestamp = new_timestamp
+        self.event = event
+
+    def apply(self, editor):
+        self._move(self._track(editor), self.timestamp, self.new_timestamp)
+
+    def revert(self, editor):
+        self._move(self._track(editor), self.new_timestamp, self.timestamp)
+
+    def merge(self, other):
+        # Consecutive nudges of the same item collapse into one move
+        if type(other) is type(self) and self._same_target(other) and other.timestamp == self.new_timestamp:
+            self.new_timestamp = other.new_timestamp
+            return True
+        return False
+
+    def _same_target(self, other):
+        return other.event is self.event
+
+    def _track(self, editor):
+        return editor.events
+
+    def _move(self, track, old, new):
+        track.remove(old, self.event)
+        track.add(new, self.event)
+
+
+class MoveKeyframe(MoveEvent):
+    def __init__(self, character, timestamp, new_timestamp, event):
+        super().__init__(timestamp, new_timestamp, event)
+        self.character = character
+
+    def _same_target(self, other):
+        return other.character == self.character and other.event is self.event
+
+    def _track(self, editor):
+        return editor.keyframes.track(self.character)
+
+
+class CommandJournal:
+    def __init__(self, max_commands=1000, max_bytes=16 * 1024 * 1024, coalesce_window=1.0):
+        self.max_commands = max_commands
+        self.max_bytes = max_bytes
+        self.coalesce_window = coalesce_window  # Seconds between edits that may be merged
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.bytes_held = 0
+        self._last_recorded = 0.0
+
+    def execute(self, editor, command):
+        """Apply a command and record it for undo."""
+        command.apply(editor)
+        self.record(command)
+        return command
+
+    def record(self, command):
+        """Record an already-applied command, merging it into the previous one when possible."""
+        self.redo_stack.clear()
+        now = time.monotonic()
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if top is not None and now - self._last_recorded <= self.coalesce_window and top.merge(command):
+            self._last_recorded = now
+            return
+
+        self._last_recorded = now
+        self.undo_stack.append(command)
+        self.bytes_held += command.size()
+        while self.undo_stack and (len(self.undo_stack) > self.max_commands or self.bytes_held > self.max_bytes):
+            self.bytes_held -= self.undo_stack.popleft().size()
+
+    def undo(self, editor):
+        """Revert the most recent command; return it, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.bytes_held -= command.size()
+        command.revert(editor)
+        self.redo_stack.append(command)
+        self._last_recorded = 0.0  # Never merge across an undo
+        return command
+
+    def redo(self, editor):
+        """Re-apply the most recently undone command."""
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        command.apply(editor)
+        self.undo_stack.append(command)
+        self.bytes_held += command.size()
+        self._last_recorded = 0.0
+        return command
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes_held = 0
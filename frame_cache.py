@@ -0,0 +1,322 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from parallel_renderer import ParallelFrameRenderer
+from tiled_compositor import TiledCompositor
+
+
+class _SpillFile:
+    """Fixed-size frame slots in one sparse, memory-mapped file."""
+
+    def __init__(self, directory, slot_bytes, slots):
+        self.slot_bytes = slot_bytes
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.file.truncate(slot_bytes * slots)  # Sparse: disk is only used for slots actually written
+        self.map = mmap.mmap(self.file.fileno(), slot_bytes * slots)
+        self.free = list(range(slots - 1, -1, -1))
+
+    def store(self, data):
+        if not self.free:
+            return None
+        slot = self.free.pop()
+        offset = slot * self.slot_bytes
+        self.map[offset:offset + len(data)] = data
+        return slot
+
+    def load(self, slot, length):
+        offset = slot * self.slot_bytes
+        return self.map[offset:offset + length]
+
+    def release(self, slot):
+        self.free.append(slot)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class FrameCache:
+    """LRU cache of rendered frames keyed by (scene hash, frame index, resolution).
+
+    Frames are held as raw pixel bytes. Past max_bytes the least recently used
+    frames spill to memory-mapped files in spill_dir (up to spill_max_bytes)
+    before being dropped altogether.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, spill_dir="output/frame_cache",
+                 spill_max_bytes=2 * 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.bytes_held = 0
+        self.bytes_spilled = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()  # key -> (mode, size, bytes)
+        self._spilled = OrderedDict()  # key -> (mode, size, slot)
+        self._spill_files = {}  # frame byte length -> _SpillFile
+        self._lock = threading.Lock()
+        if spill_max_bytes:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames or key in self._spilled
+
+    def get(self, key):
+        """Return the cached frame as a PIL image, or None."""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+            elif key in self._spilled:
+                mode, size, slot = self._spilled.pop(key)
+                length = len(mode) * size[0] * size[1]
+                entry = (mode, size, self._spill_files[length].load(slot, length))
+                self._spill_files[length].release(slot)
+                self.bytes_spilled -= length
+                self._insert(key, entry)  # Promote back into RAM
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        mode, size, data = entry
+        return Image.frombuffer(mode, size, data, "raw", mode, 0, 1)
+
+    def put(self, key, image):
+        """Store a frame; returns an image backed by the cached bytes."""
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")
+        entry = (image.mode, image.size, image.tobytes())
+        with self._lock:
+            self._discard(key)
+            self._insert(key, entry)
+        mode, size, data = entry
+        return Image.frombuffer(mode, size, data, "raw", mode, 0, 1)
+
+    def invalidate(self, scene_hash=None, frames=None):
+        """Drop frames of one scene (or all scenes), optionally only those in a frame index range."""
+        with self._lock:
+            for key in [k for k in list(self._frames) + list(self._spilled)
+                        if (scene_hash is None or k[0] == scene_hash) and (frames is None or k[1] in frames)]:
+                self._discard(key)
+
+    def clear(self):
+        self.invalidate()
+
+    def close(self):
+        with self._lock:
+            self._frames.clear()
+            self._spilled.clear()
+            for spill_file in self._spill_files.values():
+                spill_file.close()
+            self._spill_files.clear()
+            self.bytes_held = self.bytes_spilled = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "frames": len(self._frames),
+                "spilled": len(self._spilled), "bytes": self.bytes_held, "spilled_bytes": self.bytes_spilled}
+
+    def _insert(self, key, entry):
+        self._frames[key] = entry
+        self.bytes_held += len(entry[2])
+        while self.bytes_held > self.max_bytes and len(self._frames) > 1:
+            old_key, old_entry = self._frames.popitem(last=False)
+            self.bytes_held -= len(old_entry[2])
+            self._spill(old_key, old_entry)
+
+    def _spill(self, key, entry):
+        mode, size, data = entry
+        length = len(data)
+        if length > self.spill_max_bytes:
+            return
+        while self.bytes_spilled + length > self.spill_max_bytes and self._spilled:
+            self._discard(next(iter(self._spilled)))
+
+        spill_file = self._spill_files.get(length)
+        if spill_file is None:
+            spill_file = self._spill_files[length] = _SpillFile(self.spill_dir, length,
+                                                                self.spill_max_bytes // length)
+        slot = spill_file.store(data)
+        if slot is not None:
+            self._spilled[key] = (mode, size, slot)
+            self.bytes_spilled += length
+
+    def _discard(self, key):
+        entry = self._frames.pop(key, None)
+        if entry is not None:
+            self.bytes_held -= len(entry[2])
+        spilled = self._spilled.pop(key, None)
+        if spilled is not None:
+            mode, size, slot = spilled
+            length = len(mode) * size[0] * size[1]
+            self._spill_files[length].release(slot)
+            self.bytes_spilled -= length
+
+
+class TimelineFrameRenderer:
+    """Serves composited timeline frames from a FrameCache kept warm around the playhead.
+
+    A background thread renders outward from the playhead (favouring frames ahead
+    of it). Keyframe edits invalidate only the frames whose time range the edit
+    can affect.
+    """
+
+    def __init__(self, scene_generator, timeline_editor, cache=None, fps=30, resolution=(1920, 1080),
+                 style="cartoon", cast=None, background=None, interpolation="linear", radius=90, proxy=1):
+        self.scene_generator = scene_generator
+        self.timeline_editor = timeline_editor
+        self.cache = cache or FrameCache()
+        self.fps = fps
+        self.resolution = tuple(resolution)
+        self.style = style
+        self.cast = cast if cast is not None else {}
+        self.background = background
+        self.interpolation = interpolation
+        self.radius = radius  # Frames to keep rendered on either side of the playhead
+        self.proxy = proxy
+        self.scene_hash = self._scene_hash()
+
+        self.playhead = 0
+        self._descriptions = None
+        self._generation = 0  # Bumped on every edit so stale renders are never stored
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+        timeline_editor.on_keyframes_changed(self._keyframes_changed)
+
+    def frame_count(self):
+        return len(self._get_descriptions()[1])
+
+    def frame(self, index, render=True):
+        """Return one frame, rendering it now if the cache does not have it (or None if render is False)."""
+        key = self._key(index)
+        image = self.cache.get(key)
+        if image is None and render:
+            image = self._render(index)
+        return image
+
+    def frames(self, workers=1, mp_context=None):
+        """Yield every frame of the timeline in order for export, using cached frames where possible.
+
+        Frames missing from the cache are composited incrementally from the previous
+        one (or sharded across worker processes when workers > 1) and are not stored,
+        so a long export never evicts the preview's frames or spills to disk. Each
+        yielded frame is only valid until the next is requested.
+        """
+        _, descriptions = self._get_descriptions()
+        cached = {index for index in range(len(descriptions)) if self._key(index) in self.cache}
+        missing = (description for index, description in enumerate(descriptions) if index not in cached)
+        if workers > 1:
+            rendered = ParallelFrameRenderer(self.scene_generator.asset_library_path, workers, proxy=self.proxy,
+                                             mp_context=mp_context).render(missing)
+        else:
+            compositor = TiledCompositor(self.scene_generator, proxy=self.proxy)
+            rendered = (compositor.render(description, copy=False)[0] for description in missing)
+
+        for index, description in enumerate(descriptions):
+            if index not in cached:
+                yield next(rendered)
+                continue
+            image = self.cache.get(self._key(index))
+            if image is None:  # Evicted since we looked
+                image = self.scene_generator.render_frame(description, self.proxy)
+            yield image
+
+    def cast_changed(self):
+        """Call after adding, removing or moving cast members; frames of the old cast are dropped."""
+        with self._lock:
+            self._generation += 1
+            self._descriptions = None
+            old_hash, self.scene_hash = self.scene_hash, self._scene_hash()
+        self.cache.invalidate(old_hash)
+        self._wake.set()
+
+    def set_playhead(self, seconds):
+        """Move the playhead; the background worker re-centres on it."""
+        self.playhead = max(int(round(seconds * self.fps)), 0)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name="frame-cache", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _scene_hash(self):
+        # Only what the compositor reads; preview items and other extras must not change the hash
+        cast = {track: [member["category"], member["name"], member.get("position", (0, 0))]
+                for track, member in self.cast.items()}
+        settings = [self.style, self.resolution, self.background, cast, self.fps, self.interpolation, self.proxy]
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _key(self, index):
+        return (self.scene_hash, index, self.scene_generator.proxy_size(self.resolution, self.proxy))
+
+    def _get_descriptions(self):
+        with self._lock:
+            if self._descriptions is None:
+                duration = self.timeline_editor.get_duration()
+                descriptions = list(self.scene_generator.describe_timeline_frames(
+                    self.timeline_editor, duration + 1 / self.fps, self.fps, self.style, self.resolution,
+                    self.cast, self.background, self.interpolation))
+                self._descriptions = (self._generation, descriptions)
+            return self._descriptions
+
+    def _render(self, index):
+        generation, descriptions = self._get_descriptions()
+        if not 0 <= index < len(descriptions):
+            raise IndexError(f"Frame {index} is outside the timeline")
+        image = self.scene_generator.render_frame(descriptions[index], self.proxy)
+        with self._lock:
+            if generation == self._generation:  # The timeline wasn't edited while we rendered
+                return self.cache.put(self._key(index), image)
+        return image
+
+    def _keyframes_changed(self, character, start, end):
+        with self._lock:
+            self._generation += 1
+            self._descriptions = None
+        first = 0 if math.isinf(start) else max(int(math.floor(start * self.fps)), 0)
+        if math.isinf(end):
+            frames = range(first, 1 << 62)
+        else:
+            frames = range(first, int(math.ceil(end * self.fps)) + 1)
+        self.cache.invalidate(self.scene_hash, frames)
+        self._wake.set()
+
+    def _work(self):
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            playhead = self.playhead
+            for offset in self._order():
+                if self._stopped or self._wake.is_set():
+                    break  # Playhead moved or timeline changed; start again from the new centre
+                index = playhead + offset
+                if index < 0 or index >= self.frame_count() or self._key(index) in self.cache:
+                    continue
+                try:
+                    self._render(index)
+                except (OSError, ValueError, IndexError) as e:
+                    print(f"Warning: Could not pre-render frame {index} - {e}")
+
+    def _order(self):
+        # Outwards from the playhead, each step ahead before the matching step behind
+        for step in range(self.radius + 1):
+            yield step
+            if step:
+                yield -step
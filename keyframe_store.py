@@ -0,0 +1,278 @@
+import bisect
+from array import array
+from functools import partial
+
+import numpy as np
+
+from motion_samples import MOTION_DTYPE
+
+INTERPOLATIONS = ("step", "linear", "cubic", "ease")
+
+
+def locate(times, sample_times):
+    """Find the surrounding keyframe pair and blend factor for each sample time."""
+    last = len(times) - 1
+    i0 = np.clip(np.searchsorted(times, sample_times, side="right") - 1, 0, last)
+    i1 = np.minimum(i0 + 1, last)
+    span = times[i1] - times[i0]
+    alpha = np.divide(sample_times - times[i0], span, out=np.zeros_like(sample_times), where=span > 0)
+    return i0, i1, np.clip(alpha, 0.0, 1.0)
+
+
+def interpolate(times, values, sample_times, mode="linear", location=None):
+    """Interpolate keyframe values at many sample times at once.
+
+    Values hold at the first/last keyframe outside the keyed range. "cubic" is a
+    Catmull-Rom spline through the keyframes; "ease" eases in and out of each one.
+    values may be 1-D or (keyframes, channels); pass a precomputed locate() result
+    to share the search between properties keyed at the same times.
+    """
+    if mode not in INTERPOLATIONS:
+        raise ValueError(f"Unsupported interpolation: {mode}")
+    i0, i1, alpha = location if location is not None else locate(times, sample_times)
+    if mode == "step":
+        return values[i0]
+
+    if values.ndim > 1:
+        alpha = alpha[:, None]
+    v0, v1 = values[i0], values[i1]
+    if mode == "linear":
+        return v0 + (v1 - v0) * alpha
+    if mode == "ease":
+        return v0 + (v1 - v0) * alpha * alpha * (3 - 2 * alpha)
+
+    last = len(times) - 1
+    vp, vn = values[np.maximum(i0 - 1, 0)], values[np.minimum(i1 + 1, last)]
+    a2, a3 = alpha * alpha, alpha * alpha * alpha
+    return 0.5 * (2 * v0 + (v1 - vp) * alpha + (2 * vp - 5 * v0 + 4 * v1 - vn) * a2
+                  + (3 * v0 - vp - 3 * v1 + vn) * a3)
+
+
+class KeyframeTrack:
+    def __init__(self):
+        self.times = array("d")  # Sorted timestamps, bisectable in place
+        self.events = []
+        self.version = 0  # Bumped on every change so derived columns can be cached
+        self.listeners = []  # Called with the (start, end) time range an edit can affect
+        self._columns = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def add(self, timestamp, event):
+        """Insert a keyframe after any existing keyframes with the same timestamp."""
+        index = bisect.bisect_right(self.times, timestamp)
+        self.times.insert(index, timestamp)
+        self.events.insert(index, event)
+        self.version += 1
+        self._changed(index, index)
+        return index
+
+    def bulk_add(self, timestamps, events):
+        """Insert many keyframes with one sort instead of one insertion each."""
+        timestamps = [float(t) for t in timestamps]
+        events = list(events)
+        if len(timestamps) != len(events):
+            raise ValueError("Expected one event per timestamp")
+        if not timestamps:
+            return
+
+        ordered = all(a <= b for a, b in zip(timestamps, timestamps[1:]))
+        if ordered and (not self.times or timestamps[0] >= self.times[-1]):
+            self.times.extend(timestamps)
+            self.events.extend(events)
+        else:
+            # Stable sort keeps existing keyframes ahead of new ones at equal timestamps
+            merged = sorted(zip(list(self.times) + timestamps, self.events + events), key=lambda kf: kf[0])
+            self.times = array("d", (t for t, _ in merged))
+            self.events = [event for _, event in merged]
+        self.version += 1
+        self._changed(bisect.bisect_left(self.times, min(timestamps)),
+                      bisect.bisect_right(self.times, max(timestamps)) - 1)
+
+    def replace(self, timestamps, events):
+        """Swap every keyframe on the track for a new set."""
+        self.times, self.events = array("d"), []
+        if timestamps is not None and len(timestamps):
+            self.bulk_add(timestamps, events)  # Its notification range is open-ended on an empty track
+        else:
+            self.version += 1
+            self._notify(float("-inf"), float("inf"))
+
+    def remove(self, timestamp, event=None):
+        """Remove the first keyframe at a timestamp (matching event, if given) and return it."""
+        index = self.find(timestamp, event)
+        if index is None:
+            return None
+        return self.pop(index)
+
+    def pop(self, index):
+        affected = self.influence(index, index)
+        timestamp = self.times.pop(index)
+        event = self.events.pop(index)
+        self.version += 1
+        self._notify(*affected)
+        return {"timestamp": timestamp, "event": event}
+
+    def find(self, timestamp, event=None):
+        """Return the index of the first keyframe at a timestamp, or None."""
+        index = bisect.bisect_left(self.times, timestamp)
+        while index < len(self.times) and self.times[index] == timestamp:
+            if event is None or self.events[index] == event:
+                return index
+            index += 1
+        return None
+
+    def range(self, start, end):
+        """Return keyframes with start <= timestamp <= end."""
+        lo = bisect.bisect_left(self.times, start)
+        hi = bisect.bisect_right(self.times, end)
+        return [{"timestamp": self.times[i], "event": self.events[i]} for i in range(lo, hi)]
+
+    def active_at(self, timestamp):
+        """Return the latest keyframe at or before a timestamp, or None."""
+        index = bisect.bisect_right(self.times, timestamp) - 1
+        if index < 0:
+            return None
+        return {"timestamp": self.times[index], "event": self.events[index]}
+
+    def end_time(self):
+        return self.times[-1] if self.times else 0
+
+    def influence(self, first, last):
+        """Time range whose interpolated values depend on keyframes first..last.
+
+        Cubic interpolation reaches two keyframes to either side; before the first and
+        after the last keyframe values hold, so the range is open-ended there.
+        """
+        start = self.times[first - 2] if first >= 2 else float("-inf")
+        end = self.times[last + 2] if last + 2 < len(self.times) else float("inf")
+        return start, end
+
+    def _changed(self, first, last):
+        if self.listeners:
+            self._notify(*self.influence(first, last))
+
+    def _notify(self, start, end):
+        for listener in self.listeners:
+            listener(start, end)
+
+    def to_list(self):
+        return [{"timestamp": t, "event": event} for t, event in zip(self.times, self.events)]
+
+    def columns(self):
+        """Return numeric (times, values) columns per animated property, cached until the track changes."""
+        if self._columns is not None and self._columns[0] == self.version:
+            return self._columns[1]
+
+        keyed = {"position": ([], []), "scale": ([], []), "rotation": ([], [])}
+        for timestamp, event in zip(self.times, self.events):
+            if not isinstance(event, dict):
+                continue
+            for name, (times, values) in keyed.items():
+                if name in event:
+                    times.append(timestamp)
+                    values.append(event[name])
+
+        columns = {}
+        for name, (times, values) in keyed.items():
+            if times:
+                columns[name] = (np.asarray(times, dtype=float), np.asarray(values, dtype=float))
+        self._columns = (self.version, columns)
+        return columns
+
+    def sample(self, sample_times, interpolation="linear"):
+        """Sample position, scale and rotation at the given times.
+
+        x and y are NaN before the first position keyframe (and for tracks that
+        have none) so renderers can skip the character.
+        """
+        sample_times = np.asarray(sample_times, dtype=float)
+        samples = np.zeros(sample_times.shape, dtype=MOTION_DTYPE)
+        samples["scale"] = 1
+        samples["x"] = np.nan
+        samples["y"] = np.nan
+
+        located = None  # Properties keyed at the same times share one search
+        for name, (times, values) in self.columns().items():
+            if located is None or not np.array_equal(located[0], times):
+                located = (times, locate(times, sample_times))
+            result = interpolate(times, values, sample_times, interpolation, located[1])
+            if name == "position":
+                hidden = sample_times < times[0]
+                samples["x"] = np.where(hidden, np.nan, result[:, 0])
+                samples["y"] = np.where(hidden, np.nan, result[:, 1])
+            else:
+                samples[name] = result
+        return samples
+
+
+class KeyframeStore:
+    def __init__(self):
+        self.tracks = {}
+        self.listeners = []  # Called with (character, start, end) whenever a track changes
+
+    def __contains__(self, character):
+        return character in self.tracks
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def track(self, character):
+        """Return the track for a character, creating it on first use."""
+        track = self.tracks.get(character)
+        if track is None:
+            track = self.tracks[character] = KeyframeTrack()
+            track.listeners.append(partial(self._notify, character))
+        return track
+
+    def add(self, character, timestamp, event):
+        return self.track(character).add(timestamp, event)
+
+    def bulk_add(self, character, timestamps, events):
+        self.track(character).bulk_add(timestamps, events)
+
+    def replace(self, character, timestamps, events):
+        self.track(character).replace(timestamps, events)
+
+    def get(self, character):
+        """Return a character's keyframes as a sorted list of dicts."""
+        track = self.tracks.get(character)
+        return track.to_list() if track else []
+
+    def characters(self):
+        return list(self.tracks)
+
+    def items(self):
+        return [(character, track.to_list()) for character, track in self.tracks.items()]
+
+    def range(self, start, end, characters=None):
+        """Return each character's keyframes inside a time window."""
+        characters = self.tracks if characters is None else characters
+        return {character: self.tracks[character].range(start, end)
+                for character in characters if character in self.tracks}
+
+    def active_at(self, timestamp):
+        """Return the keyframe in effect at a timestamp for every character that has one."""
+        active = {}
+        for character, track in self.tracks.items():
+            keyframe = track.active_at(timestamp)
+            if keyframe is not None:
+                active[character] = keyframe
+        return active
+
+    def sample(self, sample_times, interpolation="linear", characters=None):
+        """Sample every character's track at the given times."""
+        characters = self.tracks if characters is None else characters
+        return {character: self.tracks[character].sample(sample_times, interpolation)
+                for character in characters if character in self.tracks}
+
+    def end_time(self):
+        return max((track.end_time() for track in self.tracks.values() if len(track)), default=0)
+
+    def _notify(self, character, start, end):
+        for listener in self.listeners:
+            listener(character, start, end)
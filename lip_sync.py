@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from audio_graph import decode_audio
+
+ANALYZER_VERSION = 1  # Bump when features or thresholds change to invalidate cached results
+
+
+class LipSyncAnalyzer:
+    """Offline audio -> viseme analysis: rest, mbp (closed), ah (open), oo (round), ee (wide), fv (fricative)."""
+
+    def __init__(self, fps=24, sample_rate=16000, cache_dir="output/lipsync_cache", block_frames=4096):
+        self.fps = fps
+        self.sample_rate = sample_rate
+        self.cache_dir = cache_dir
+        self.block_frames = block_frames  # Video frames analysed per FFT batch, bounds memory
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def analyze(self, audio_file):
+        """Return frame-aligned viseme changes as [{"time": ms, "phoneme": viseme}], cached by audio content."""
+        cache_file = os.path.join(self.cache_dir, f"{self._cache_key(audio_file)}.json")
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                return json.load(f)
+
+        samples, _ = decode_audio(audio_file, self.sample_rate, 1)
+        visemes = self.classify(self.features(samples[:, 0]))
+
+        # Keep only frames where the mouth shape changes
+        changes = np.flatnonzero(np.concatenate(([True], visemes[1:] != visemes[:-1])))
+        timeline = [{"time": round(float(i) * 1000 / self.fps, 3), "phoneme": str(visemes[i])} for i in changes]
+
+        temp_file = f"{cache_file}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(timeline, f)
+        os.replace(temp_file, cache_file)
+        return timeline
+
+    def features(self, samples):
+        """Per video frame: energy (dB), zero-crossing rate, spectral centroid and band energy ratios."""
+        hop = self.sample_rate / self.fps
+        window = int(2 * hop)
+        frame_count = int(np.ceil(len(samples) / hop))
+        padded = np.pad(samples.astype(np.float32), (window // 2, window))
+        starts = (np.arange(frame_count) * hop).astype(np.int64)
+        taper = np.hanning(window).astype(np.float32)
+        freqs = np.fft.rfftfreq(window, 1 / self.sample_rate)
+        low, high = freqs < 1000, freqs > 4000
+
+        views = sliding_window_view(padded, window)
+        columns = {name: np.empty(frame_count, dtype=np.float32)
+                   for name in ("energy", "zcr", "centroid", "low", "high")}
+        for block in range(0, frame_count, self.block_frames):
+            frames = views[starts[block:block + self.block_frames]]
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            power = np.abs(np.fft.rfft(frames * taper, axis=1)) ** 2
+            total = power.sum(axis=1) + 1e-12
+
+            part = slice(block, block + len(frames))
+            columns["energy"][part] = 20 * np.log10(rms + 1e-9)
+            columns["zcr"][part] = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+            columns["centroid"][part] = power @ freqs / total
+            columns["low"][part] = power[:, low].sum(axis=1) / total
+            columns["high"][part] = power[:, high].sum(axis=1) / total
+        return columns
+
+    def classify(self, features):
+        """Rule-based viseme classifier over whole feature columns at once."""
+        energy = features["energy"]
+        if not len(energy):
+            return np.array([], dtype=object)
+        # Thresholds are relative to the loud parts of the clip so levels don't matter
+        peak = np.percentile(energy, 95)
+        silent = energy < max(peak - 35, -60)
+        quiet = energy < peak - 20
+
+        conditions = [
+            silent,
+            (features["zcr"] > 0.25) & (features["high"] > 0.35),
+            quiet,
+            features["centroid"] < 700,
+            features["centroid"] > 1800,
+        ]
+        choices = ["rest", "fv", "mbp", "oo", "ee"]
+        return np.select(conditions, choices, default="ah").astype(object)
+
+    def apply_to_timeline(self, timeline, timeline_editor, character, offset=0):
+        """Write viseme keyframes for a character, offset in seconds.
+
+        Visemes already on the track within the clip's time range are replaced, so
+        applying the same clip again leaves one set; other keyframes are kept.
+        """
+        if not timeline:
+            return
+        times = [offset + entry["time"] / 1000 for entry in timeline]
+        kept = [kf for kf in timeline_editor.get_keyframes(character)
+                if not (isinstance(kf["event"], dict) and "viseme" in kf["event"]
+                        and times[0] <= kf["timestamp"] <= times[-1])]
+        visemes = [{"viseme": entry["phoneme"]} for entry in timeline]
+        timeline_editor.set_keyframes(character, [kf["timestamp"] for kf in kept] + times,
+                                      [kf["event"] for kf in kept] + visemes)
+
+    def _cache_key(self, audio_file):
+        digest = hashlib.sha256()
+        with open(audio_file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(f"{ANALYZER_VERSION}:{self.fps}:{self.sample_rate}".encode())
+        return digest.hexdigest()
+
+# Example Usage
+if __name__ == "__main__":
+    analyzer = LipSyncAnalyzer(fps=24)
+    print(analyzer.analyze("hello.mp3")[:10])
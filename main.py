@@ -1,4 +1,7 @@
+import multiprocessing
 import sys
+from itertools import islice
+from PyQt6 import sip
 from PyQt6.QtWidgets import QApplication,QFileDialog, QMainWindow
 from ui_setup import setup_ui
 from asset_manager import AssetManager
@@ -7,11 +10,12 @@ from timeline_manager import TimelineManager
 from motion_automation import MotionAutomation
 from audio_integration import AudioIntegration
 from timeline_editor import TimelineEditor
+from video_exporter import VideoExporter
+from qt_image import load_qimage, pil_to_qimage
+from playback_engine import PlaybackEngine
+from frame_cache import TimelineFrameRenderer
 
 import os
-import cv2
-import numpy as np
-import ffmpeg
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, QVBoxLayout, QWidget,
     QHBoxLayout, QListWidget, QFrame, QSplitter, QGraphicsView, QGraphicsScene
@@ -26,10 +30,9 @@ from PyQt6.QtGui import QMovie
 from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsTextItem
 from PyQt6.QtGui import QPixmap
-from PIL import Image
 from PyQt6.QtWidgets import QGraphicsPixmapItem
 from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QVBoxLayout, QSplitter
-from PyQt6.QtWidgets import QSizePolicy
+from PyQt6.QtWidgets import QSizePolicy, QGraphicsItem
 
 class AnimationTool(QMainWindow):
     def __init__(self):
@@ -40,12 +43,25 @@ class AnimationTool(QMainWindow):
         self.motion_automation = MotionAutomation()
         self.audio_integration = AudioIntegration()
         self.timeline_editor = TimelineEditor()
+        self.video_exporter = VideoExporter()
+        # Processes for exporting frames missing from the cache. Incremental compositing on one process
+        # usually wins for mostly static scenes; raise this for heavy multi-layer scenes on many cores
+        self.export_workers = 1
 
+        self.cast = {}  # Timeline track -> asset (and preview item) it animates, shared with preview and export
         self.asset_manager = AssetManager(self.scene_generator, None)  # Preview scene set in setup_ui
         self.timeline_manager = TimelineManager(None)  # Set later in setup_ui
 
         # Setup UI
         setup_ui(self)
+        self.playback = PlaybackEngine(self.scene_generator, self.timeline_editor, self.preview_scene,
+                                       fps=60, cast=self.cast, fps_label=self.fps_label, proxy=2)
+        # Full-quality frames for export and for the paused preview; scrubbing re-centres its prefetch worker
+        self.frame_renderer = TimelineFrameRenderer(self.scene_generator, self.timeline_editor, fps=30,
+                                                    resolution=(1920, 1080), style="cartoon", cast=self.cast)
+        self.still_item = None  # Composited frame shown over the preview items while paused
+        self.playback.frame_changed.connect(self.playhead_moved)
+        self.timeline_editor.on_keyframes_changed(self.timeline_changed)
 
     def new_project(self):
         """Start a new project."""
@@ -67,9 +83,24 @@ class AnimationTool(QMainWindow):
         """Export the animation as an MP4 video."""
         export_file, _ = QFileDialog.getSaveFileName(self, "Export Video", "", "MP4 Video (*.mp4)")
         if export_file:
-            command = f"ffmpeg -framerate 30 -i output/scenes/%04d.png -i output/audio/final_audio.mp3 -c:v libx264 -pix_fmt yuv420p {export_file}"
-            os.system(command)
-            print(f"Video exported: {export_file}")
+            fps = self.frame_renderer.fps
+            resolution = self.frame_renderer.resolution
+            duration = self.timeline_editor.get_duration()
+            if duration <= 0:
+                print("Nothing to export. Add keyframes to the timeline first.")
+                return
+
+            audio_file = "output/audio/final_audio.mp3"
+            # Frames already rendered around the preview playhead come straight from the cache
+            # Worker processes are spawned, since forking a running Qt app is unsafe
+            frames = islice(self.frame_renderer.frames(self.export_workers, multiprocessing.get_context("spawn")),
+                            int(round(duration * fps)))
+            try:
+                self.video_exporter.export(frames, export_file, resolution, fps=fps,
+                                           audio_file=audio_file if os.path.exists(audio_file) else None,
+                                           frame_count=int(round(duration * fps)))
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"Error exporting video: {e}")
 
     def populate_asset_categories(self):
         """List asset categories (Backgrounds, Characters, Props, Audio) in the library."""
@@ -81,15 +112,7 @@ class AnimationTool(QMainWindow):
 
     def load_asset_files(self, item):
         """Show actual files inside the selected asset category."""
-        category = item.text()
-        asset_path = os.path.join(self.scene_generator.asset_library_path, category)
-        
-        self.asset_list.clear()  # ✅ Clear the list and show actual assets
-        self.asset_list.addItem(".. (Back)")  # ✅ Allow going back to categories
-
-        for file in os.listdir(asset_path):
-            if file.endswith((".png", ".jpg", ".gif")):  # ✅ Show only images
-                self.asset_list.addItem(file)
+        self.asset_manager.load_asset_files(self.asset_list, item)  # ✅ Thumbnails load in the background
 
     def dropEvent(self, event):
         """Drop an animation onto the timeline."""
@@ -121,9 +144,23 @@ class AnimationTool(QMainWindow):
             item = QGraphicsPixmapItem(pixmap)
             item.setPos(100, 100)  # Default position
             self.preview_scene.addItem(item)
+            self.add_to_cast(item, asset_category, assets[0])
 
             print(f"Added {assets[0]} to scene")
 
+    def add_to_cast(self, item, category, name):
+        """Give a preview item its own timeline track, named after its asset."""
+        base = os.path.splitext(name)[0]
+        track, number = base, 1
+        while track in self.cast:
+            number += 1
+            track = f"{base} {number}"
+        item.setData(0, track)
+        item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        self.cast[track] = {"category": category, "name": name, "position": (item.x(), item.y()), "item": item}
+        self.frame_renderer.cast_changed()
+        return track
+
     def asset_selected(self, item):
         """Preview selected asset before adding it to the scene."""
         category = item.text()
@@ -165,21 +202,65 @@ class AnimationTool(QMainWindow):
 
 
     def add_motion(self):
-        """Move character inside the scene."""
-        selected_item = self.preview_scene.items()[0]  # Get first character/item
-        if not isinstance(selected_item, QGraphicsPixmapItem):
+        """Give the selected preview item (or the topmost character) a walk cycle and play it."""
+        items = [item for item in self.preview_scene.selectedItems() + self.preview_scene.items()
+                 if isinstance(item, QGraphicsPixmapItem) and item.data(0) in self.cast]
+        if not items:
             print("No character selected for motion")
             return
-
-        # Define motion path
-        positions = [(100, 100), (200, 100), (300, 100), (400, 100)]
-
-        def move_character(step=0):
-            if step < len(positions):
-                selected_item.setPos(*positions[step])
-                QTimer.singleShot(500, lambda: move_character(step + 1))  # Move every 500ms
-
-        move_character()
+        # Replaces the track's keyframes, so repeated clicks don't stack copies of the cycle
+        self.timeline_editor.sync_with_motion("walk", items[0].data(0), 2, fps=self.playback.fps, replace=True)
+        self.playback.play()
+
+    def scrub(self, value):
+        """Move the playhead from the scrub bar; while paused, show the cached full-quality frame."""
+        seconds = value / 1000
+        self.playback.seek(seconds)
+        self.frame_renderer.set_playhead(seconds)
+        if not self.playback.is_playing():
+            # Mid-drag only cached frames are shown, so dragging never waits on the compositor
+            self.show_still(seconds, render=not self.scrub_slider.isSliderDown())
+
+    def scrub_released(self):
+        if not self.playback.is_playing():
+            self.show_still(self.scrub_slider.value() / 1000)
+
+    def playhead_moved(self, frame, seconds):
+        if self.playback.is_playing():
+            self.hide_still()
+            self.scrub_slider.blockSignals(True)  # Following playback, not scrubbing
+            self.scrub_slider.setValue(int(seconds * 1000))
+            self.scrub_slider.blockSignals(False)
+
+    def timeline_changed(self, character, start, end):
+        self.hide_still()
+        self.scrub_slider.setMaximum(int(self.timeline_editor.get_duration() * 1000))
+
+    def show_still(self, seconds, render=True):
+        """Cover the preview items with the composited frame at a time, if it is cached or render is True."""
+        count = self.frame_renderer.frame_count()
+        if not count:
+            return
+        index = min(max(int(round(seconds * self.frame_renderer.fps)), 0), count - 1)
+        try:
+            image = self.frame_renderer.frame(index, render)
+        except (OSError, ValueError, IndexError) as e:
+            print(f"Warning: Could not render frame {index} - {e}")
+            image = None
+        if image is None:
+            self.hide_still()  # The draft preview items stand in until the frame is cached
+            return
+        if self.still_item is None or sip.isdeleted(self.still_item) or self.still_item.scene() is None:
+            self.still_item = QGraphicsPixmapItem()
+            self.still_item.setZValue(1000)
+            self.preview_scene.addItem(self.still_item)
+        self.still_item.setPixmap(QPixmap.fromImage(pil_to_qimage(image)))
+        self.still_item.setScale(self.playback.resolution[0] / image.width)
+        self.still_item.show()
+
+    def hide_still(self):
+        if self.still_item is not None and not sip.isdeleted(self.still_item):
+            self.still_item.hide()
 
     def show_image(self, image_path):
         """Display an image in the UI preview panel using QGraphicsView."""
@@ -187,16 +268,15 @@ class AnimationTool(QMainWindow):
             print(f"Error: Image file {image_path} does not exist.")
             return
 
-        # Remove ICC profile to prevent libpng warning
+        # Decode once with PIL; the ICC profile is applied in memory, never written back
         try:
-            img = Image.open(image_path)
-            img = img.convert("RGB")  # Convert to RGB to remove profile
-            img.save(image_path, "PNG", icc_profile=None)  # Remove ICC profile
-        except Exception as e:
-            print(f"Warning: Could not remove ICC profile from {image_path} - {e}")
+            image = load_qimage(image_path)
+        except OSError as e:
+            print(f"Error: Could not load {image_path} - {e}")
+            return
 
         # Display in QGraphicsView
-        pixmap = QPixmap(image_path)
+        pixmap = QPixmap.fromImage(image)
         self.preview_scene.clear()  # Clear previous preview
         item = QGraphicsPixmapItem(pixmap)
         self.preview_scene.addItem(item)
@@ -208,6 +288,8 @@ class AnimationTool(QMainWindow):
 
     def preview_animation_old(self):
         """Real-time preview of animation."""
+        import cv2
+
         video_path = "output/preview.mp4"
         cap = cv2.VideoCapture(video_path)
         while cap.isOpened():
@@ -221,16 +303,12 @@ class AnimationTool(QMainWindow):
         cv2.destroyAllWindows()
 
     def preview_animation(self):
-        """Real-time preview of animation using QMovie (for GIFs)"""
-        gif_path = "output/motion/Character_walk.gif"  # Change to your generated GIF file
-
-        if not os.path.exists(gif_path):
-            print("No preview available. Generate animation first.")
-            return
-
-        self.movie = QMovie(gif_path)
-        self.preview_label.setMovie(self.movie)
-        self.movie.start()
+        """Real-time preview of the timeline; toggles play/pause."""
+        self.playback.toggle()
+        if self.playback.is_playing():
+            self.hide_still()
+        elif self.playback.frame >= 0:
+            self.show_still(self.playback.frame / self.playback.fps)
 
 
 if __name__ == "__main__":
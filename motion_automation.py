@@ -1,8 +1,34 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 import time
-from PIL import Image, ImageDraw  
+
+from motion_samples import MOTION_DTYPE
+from sprite_writer import SpriteAnimationWriter
+
+
+_frame_writer = None
+
+
+def init_frame_writer(image_size):
+    """Give a worker process one sprite canvas to reuse for every frame it renders."""
+    global _frame_writer
+    _frame_writer = SpriteAnimationWriter(image_size)
+
+
+def render_motion_frame(pose):
+    """Render a single motion frame; module-level so process pools can pickle it."""
+    return _frame_writer.render(*pose).copy()
+
+
+def motion_poses(positions):
+    """Yield (scale, rotation) for sampled motion arrays or legacy position tuples."""
+    if isinstance(positions, np.ndarray) and positions.dtype == MOTION_DTYPE:
+        yield from zip(positions["scale"], positions["rotation"])
+        return
+    for pos in positions:
+        scale = pos[1] if isinstance(pos[1], (float, int)) else 1
+        rotation = pos[0] if isinstance(pos[0], (float, int)) else 0
+        yield scale, rotation
 
 
 class MotionAutomation:
@@ -15,6 +41,15 @@ class MotionAutomation:
             "scale": self._scaling_motion,  # ✅ New
             "rotate": self._rotation_motion  # ✅ New
         }
+        # Vectorized curves: t and duration may be arrays of any broadcastable shape
+        self.motion_curves = {
+            "walk": self._walk_curve,
+            "jump": self._jump_curve,
+            "bounce": self._bounce_curve,
+            "zigzag": self._zigzag_curve,
+            "scale": self._scaling_curve,
+            "rotate": self._rotation_curve
+        }
 
     def apply_motion_old(self, character, motion_type, duration=2, preview=False, save_as_gif=True):
         """Apply motion to a character with optional real-time preview."""
@@ -34,40 +69,30 @@ class MotionAutomation:
         else:
             raise ValueError("Unsupported motion type")
 
-    def apply_motion(self, character, motion_type, duration=2, save_as_gif=True):
-        """Apply motion to a character and optionally save it as a GIF."""
+    def apply_motion(self, character, motion_type, duration=2, save_as_gif=True, renderer=None, sprite_format="gif",
+                     output_file=None):
+        """Apply motion to a character and optionally save it as a GIF (to output_file if given)."""
         if motion_type not in self.preset_animations:
             raise ValueError(f"Unsupported motion type: {motion_type}")
 
         positions = self.preset_animations[motion_type](duration)
 
         if save_as_gif:
-            output_file = f"output/motion/{character}_{motion_type}.gif"
-            os.makedirs("output/motion", exist_ok=True)
-            self._save_motion_as_gif(positions, output_file)
+            output_file = output_file or f"output/motion/{character}_{motion_type}.{sprite_format}"
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            self._save_motion_as_gif(positions, output_file, renderer=renderer)
             return output_file
 
         return positions
 
-    def _save_motion_as_gif(self, positions, output_file, image_size=(400, 400)):
-        """Save the character motion as an animated GIF."""
-        frames = []
-        for i, pos in enumerate(positions):
-            img = Image.new("RGBA", image_size, "white")
-            draw = ImageDraw.Draw(img)
-            x, y = 200, 200  # Center point
-            scale = pos[1] if isinstance(pos[1], (float, int)) else 1
-            rotation = pos[0] if isinstance(pos[0], (float, int)) else 0
-
-            # Apply scaling and rotation
-            ellipse_size = int(20 * scale)
-            rotated_img = img.rotate(rotation)
-            draw.ellipse((x - ellipse_size, y - ellipse_size, x + ellipse_size, y + ellipse_size), fill="blue")
-
-            frames.append(rotated_img)
-
-        frames[0].save(output_file, save_all=True, append_images=frames[1:], duration=50, loop=0)
-        return output_file
+    def _save_motion_as_gif(self, positions, output_file, image_size=(400, 400), renderer=None, format=None):
+        """Save the character motion as an animated GIF (or APNG/WebP)."""
+        writer = SpriteAnimationWriter(image_size)
+        if renderer is not None:
+            frames = renderer.map_frames(render_motion_frame, motion_poses(positions),
+                                         initializer=init_frame_writer, initargs=(image_size,))
+            return writer.save_frames(frames, output_file, format)
+        return writer.write(motion_poses(positions), output_file, format)
     
 
     def _scaling_motion(self, duration):
@@ -83,34 +108,106 @@ class MotionAutomation:
 
     def _walk_animation(self, duration):
         """Simulate a walking motion (linear movement)."""
-        t = np.linspace(0, duration, num=30)
-        x = np.linspace(0, 10, num=30)
-        y = np.sin(4 * np.pi * t) * 0.5
-        return list(zip(x, y))
+        path = self._walk_curve(np.linspace(0, duration, num=30), duration)
+        return list(zip(path["x"], path["y"]))
 
     def _jump_animation(self, duration):
         """Simulate a jumping motion with gravity effect."""
-        t = np.linspace(0, duration, num=30)
-        y = -4 * (t - duration / 2) ** 2 + duration
-        x = np.linspace(0, 5, num=30)
-        return list(zip(x, y))
+        path = self._jump_curve(np.linspace(0, duration, num=30), duration)
+        return list(zip(path["x"], path["y"]))
 
     def _bounce_animation(self, duration):
         """Simulate a bouncing motion."""
-        t = np.linspace(0, duration, num=30)
-        y = np.abs(np.sin(3 * np.pi * t) * 3)
-        x = np.linspace(0, 5, num=30)
-        return list(zip(x, y))
+        path = self._bounce_curve(np.linspace(0, duration, num=30), duration)
+        return list(zip(path["x"], path["y"]))
     
     def _zigzag_motion(self, duration):
         """Simulate a zigzag motion pattern."""
-        t = np.linspace(0, duration, num=30)
-        x = np.linspace(0, 10, num=30)
-        y = np.sin(3 * np.pi * x / 10) * 2
-        return list(zip(x, y))
+        path = self._zigzag_curve(np.linspace(0, duration, num=30), duration)
+        return list(zip(path["x"], path["y"]))
+
+    def sample_motion(self, motion_type, duration=2, fps=30):
+        """Sample a preset at the given frame rate as a structured (x, y, scale, rotation) array."""
+        return self.sample_motions([motion_type], [duration], fps)[0]
+
+    def sample_motions(self, motion_types, durations, fps=30):
+        """Sample one preset per character in a single batched call.
+
+        Returns an array of shape (characters, frames); characters with shorter
+        durations hold their final pose until the longest motion ends.
+        """
+        durations = np.asarray(durations, dtype=float)
+        if durations.shape != (len(motion_types),):
+            raise ValueError("Expected one duration per motion type")
+        if np.any(durations <= 0) or fps <= 0:
+            raise ValueError("Durations and fps must be positive")
+
+        frame_count = int(round(durations.max() * fps)) + 1
+        frame_times = np.arange(frame_count) / fps
+        samples = self._empty_samples((len(motion_types), frame_count))
+
+        types = np.asarray(motion_types, dtype=object)
+        for motion_type in set(motion_types):
+            if motion_type not in self.motion_curves:
+                raise ValueError(f"Unsupported motion type: {motion_type}")
+            rows = np.flatnonzero(types == motion_type)
+            row_durations = durations[rows, None]
+            t = np.minimum(frame_times[None, :], row_durations)
+            path = self.motion_curves[motion_type](t, row_durations)
+            for field, values in path.items():
+                samples[field][rows] = values
+        return samples
+
+    def blend_motions(self, first, second, weight=0.5):
+        """Linearly blend two sampled motions; weight may be a scalar or a per-frame array."""
+        if first.shape != second.shape:
+            raise ValueError("Motions must have the same number of frames to blend")
+        weight = np.asarray(weight, dtype=float)
+        blended = np.empty(first.shape, dtype=MOTION_DTYPE)
+        for field in MOTION_DTYPE.names:
+            blended[field] = first[field] + (second[field] - first[field]) * weight
+        return blended
+
+    def compose_motions(self, *motions):
+        """Layer sampled motions: offsets and rotations add, scales multiply."""
+        if len({motion.shape for motion in motions}) != 1:
+            raise ValueError("Motions must have the same number of frames to compose")
+        composed = self._empty_samples(motions[0].shape)
+        for motion in motions:
+            composed["x"] += motion["x"]
+            composed["y"] += motion["y"]
+            composed["scale"] *= motion["scale"]
+            composed["rotation"] += motion["rotation"]
+        return composed
+
+    def _empty_samples(self, shape):
+        samples = np.zeros(shape, dtype=MOTION_DTYPE)
+        samples["scale"] = 1
+        return samples
+
+    def _walk_curve(self, t, duration):
+        return {"x": 10 * t / duration, "y": np.sin(4 * np.pi * t) * 0.5}
+
+    def _jump_curve(self, t, duration):
+        return {"x": 5 * t / duration, "y": -4 * (t - duration / 2) ** 2 + duration}
+
+    def _bounce_curve(self, t, duration):
+        return {"x": 5 * t / duration, "y": np.abs(np.sin(3 * np.pi * t) * 3)}
+
+    def _zigzag_curve(self, t, duration):
+        x = 10 * t / duration
+        return {"x": x, "y": np.sin(3 * np.pi * x / 10) * 2}
+
+    def _scaling_curve(self, t, duration):
+        return {"scale": 2 - np.abs(2 * t / duration - 1)}  # 1 -> 2 -> 1
+
+    def _rotation_curve(self, t, duration):
+        return {"rotation": 360 * t / duration}
 
     def _preview_motion(self, positions, motion_type):
         """Render a real-time preview of the motion."""
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(6, 4))
         plt.title(f"Motion Preview: {motion_type}")
         plt.xlabel("X Position")
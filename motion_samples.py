@@ -0,0 +1,4 @@
+import numpy as np
+
+# Per-frame motion sample: position, uniform scale and rotation in degrees
+MOTION_DTYPE = np.dtype([("x", "f8"), ("y", "f8"), ("scale", "f8"), ("rotation", "f8")])
@@ -0,0 +1,88 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from scene_generator import SceneGenerator
+
+_worker_generator = None
+_worker_proxy = 1
+
+
+def _init_worker(asset_library_path, cache_max_bytes, proxy=1):
+    """Give each worker process its own SceneGenerator and asset cache."""
+    global _worker_generator, _worker_proxy
+    _worker_generator = SceneGenerator(asset_library_path, cache_max_bytes)
+    _worker_proxy = proxy
+
+
+def _render_chunk(descriptions):
+    """Render a chunk of scene descriptions to raw RGBA buffers."""
+    frames = []
+    for description in descriptions:
+        frame = _worker_generator.render_frame(description, _worker_proxy)
+        frames.append((frame.size, frame.mode, frame.tobytes()))
+    return frames
+
+
+def _map_chunk(render_fn, items):
+    return [render_fn(item) for item in items]
+
+
+class ParallelFrameRenderer:
+    def __init__(self, asset_library_path="assets", workers=None, chunk_size=8, cache_max_bytes=256 * 1024 * 1024,
+                 proxy=1, mp_context=None):
+        self.asset_library_path = asset_library_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache_max_bytes = cache_max_bytes
+        self.proxy = proxy
+        self.mp_context = mp_context  # e.g. multiprocessing.get_context("spawn") from a running Qt app
+
+    def render(self, descriptions):
+        """Render scene descriptions across a process pool, yielding frames in their original order."""
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context, initializer=_init_worker,
+                                 initargs=(self.asset_library_path, self.cache_max_bytes, self.proxy)) as pool:
+            for chunk in self._ordered(pool, _render_chunk, descriptions):
+                for size, mode, data in chunk:
+                    yield Image.frombytes(mode, size, data)
+
+    def map_frames(self, render_fn, items, initializer=None, initargs=()):
+        """Apply a picklable module-level render function to items in parallel, preserving order.
+
+        initializer(*initargs) runs once per worker, e.g. to set up state render_fn reuses.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context, initializer=initializer,
+                                 initargs=initargs) as pool:
+            for chunk in self._ordered(pool, _map_chunk, items, render_fn):
+                yield from chunk
+
+    def _ordered(self, pool, fn, items, *args):
+        """Submit fixed-size chunks with a bounded window of in-flight work and yield results in order."""
+        items = iter(items)
+        pending = deque()
+        max_pending = self.workers * 2
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(items, self.chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(fn, *args, chunk))
+            if not pending:
+                return
+            yield pending.popleft().result()
+
+# Example Usage
+if __name__ == "__main__":
+    from timeline_editor import TimelineEditor
+    from video_exporter import VideoExporter
+
+    generator = SceneGenerator()
+    timeline = TimelineEditor()
+    timeline.sync_with_motion("walk", "Character1", duration=2)
+
+    descriptions = generator.describe_timeline_frames(timeline, duration=2, fps=30, style="cartoon")
+    frames = ParallelFrameRenderer().render(descriptions)
+    VideoExporter().export(frames, "output/timeline.mp4", (1920, 1080), fps=30, frame_count=60)
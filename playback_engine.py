@@ -0,0 +1,228 @@
+import os
+import time
+
+import numpy as np
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QRectF, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QGraphicsPixmapItem
+
+from motion_samples import MOTION_DTYPE
+from qt_image import pil_to_qimage
+
+
+class PlaybackEngine(QObject):
+    """Plays the timeline in a QGraphicsScene against a monotonic clock.
+
+    Keyframes are sampled once per edit into per-frame arrays; each tick shows
+    the frame the clock says is due (skipping any that were missed) and only
+    touches the items whose transform changed since the last shown frame.
+    A cast member with an "item" already in the preview scene is animated in
+    place; other characters get a proxy-resolution item of their own.
+    """
+    frame_changed = pyqtSignal(int, float)  # frame index, time in seconds
+    fps_measured = pyqtSignal(float)
+
+    def __init__(self, scene_generator, timeline_editor, preview_scene, fps=30, interpolation="linear",
+                 cast=None, resolution=(1920, 1080), fps_label=None, loop=True, proxy=1):
+        super().__init__()
+        self.scene_generator = scene_generator
+        self.timeline_editor = timeline_editor
+        self.preview_scene = preview_scene
+        self.fps = fps
+        self.interpolation = interpolation
+        self.cast = cast if cast is not None else {}  # Shared, so members added later are picked up
+        self.resolution = tuple(resolution)
+        self.fps_label = fps_label
+        self.loop = loop
+        self.proxy = proxy  # Items use assets downscaled by this factor, drawn scaled back up
+
+        self.frame = -1
+        self.frame_count = 0
+        self._signature = None
+        self._characters = []
+        self._items = []
+        self._adopted = []  # Items from the cast that we animate but don't own
+        self._background_item = None
+        self._columns = None  # (x, y, scale, rotation), each shaped (characters, frames)
+        self._shown = None  # Column values currently applied to the items
+
+        self._clock_start = 0.0
+        self._clock_frame = 0
+        self._fps_window_start = 0.0
+        self._fps_window_frames = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+    def is_playing(self):
+        return self.timer.isActive()
+
+    def play(self):
+        """Start playback from the current frame."""
+        self.prepare()
+        if not self.frame_count:
+            print("Nothing to play. Add keyframes to the timeline first.")
+            return
+        start = self.frame if 0 <= self.frame < self.frame_count - 1 else 0
+        self._reset_clock(start)
+        self._fps_window_start, self._fps_window_frames = self._clock_start, 0
+        self.timer.start(max(int(500 / self.fps), 1))  # Tick at twice the frame rate to catch each frame
+        self.show_frame(start)
+
+    def pause(self):
+        self.timer.stop()
+        self._report_fps(0.0)
+
+    def toggle(self):
+        self.pause() if self.is_playing() else self.play()
+
+    def seek(self, seconds):
+        """Jump to a time (scrubbing); playback continues from there if running."""
+        self.prepare()
+        if not self.frame_count:
+            return
+        frame = min(max(int(round(seconds * self.fps)), 0), self.frame_count - 1)
+        self._reset_clock(frame)
+        self.show_frame(frame)
+
+    def prepare(self):
+        """Resample the timeline and rebuild scene items if keyframes or the scene changed."""
+        tracks = self.timeline_editor.keyframes.tracks
+        signature = tuple((character, track.version) for character, track in tracks.items())
+        if signature == self._signature and not self._items_deleted():
+            return
+
+        duration = self.timeline_editor.get_duration()
+        frame_times, samples = self.timeline_editor.sample_timeline(0, duration + 1 / self.fps, self.fps,
+                                                                    self.interpolation)
+        self._characters = [character for character, track in samples.items()
+                            if not np.isnan(track["x"]).all()]
+        ppu = self.scene_generator.pixels_per_unit
+        anchors = np.array([self._member(c).get("position", (0, 0)) for c in self._characters],
+                           dtype=float).reshape(-1, 2)
+        if self._characters:
+            stacked = np.stack([samples[character] for character in self._characters])
+        else:
+            stacked = np.zeros((0, len(frame_times)), dtype=MOTION_DTYPE)
+        self.frame_count = len(frame_times)
+        self._signature = signature
+        offsets, scales = self._build_items()
+        self._columns = (anchors[:, :1] + offsets[:, :1] + stacked["x"] * ppu,
+                         anchors[:, 1:] + offsets[:, 1:] - stacked["y"] * ppu,
+                         stacked["scale"] * scales[:, None], stacked["rotation"])
+        self.frame = -1
+
+    def show_frame(self, frame):
+        """Apply one frame's transforms, touching only the items that changed."""
+        if frame == self.frame or not self.frame_count:
+            return
+        values = [column[:, frame] for column in self._columns]
+        visible = ~np.isnan(values[0])
+        if self._shown is None:
+            changed = np.arange(len(self._items))
+        else:
+            moved = np.zeros(len(self._items), dtype=bool)
+            for value, shown in zip(values, self._shown):
+                moved |= ~((value == shown) | (np.isnan(value) & np.isnan(shown)))
+            changed = np.flatnonzero(moved)
+
+        xs, ys, scales, rotations = values
+        for i in changed:
+            item = self._items[i]
+            item.setVisible(bool(visible[i]))
+            if visible[i]:
+                item.setPos(xs[i], ys[i])
+                item.setScale(scales[i])
+                item.setRotation(rotations[i])
+        self._shown = values
+        self.frame = frame
+        self._fps_window_frames += 1
+        self.frame_changed.emit(frame, frame / self.fps)
+
+    def _tick(self):
+        now = time.perf_counter()
+        due = self._clock_frame + int((now - self._clock_start) * self.fps)
+        if due >= self.frame_count:
+            if not self.loop:
+                self.show_frame(self.frame_count - 1)
+                self.pause()
+                return
+            due %= self.frame_count
+            self._reset_clock(due, now)
+        self.show_frame(due)  # Frames we were too late for are dropped, so playback never drifts
+
+        elapsed = now - self._fps_window_start
+        if elapsed >= 1.0:
+            self._report_fps(self._fps_window_frames / elapsed)
+            self._fps_window_start, self._fps_window_frames = now, 0
+
+    def _reset_clock(self, frame, now=None):
+        self._clock_start = time.perf_counter() if now is None else now
+        self._clock_frame = frame
+
+    def _report_fps(self, fps):
+        if self.fps_label is not None:
+            self.fps_label.setText(f"{fps:.1f} fps")
+        self.fps_measured.emit(fps)
+
+    def _member(self, character):
+        return self.cast.get(character, {"category": "characters", "name": f"{character}.png"})
+
+    def _build_items(self):
+        for item in self._items + [self._background_item]:
+            if item is not None and self._in_scene(item) and not any(item is own for own in self._adopted):
+                self.preview_scene.removeItem(item)
+        self._items = []
+        self._adopted = []
+        self._shown = None
+        self.preview_scene.setSceneRect(QRectF(0, 0, *self.resolution))
+
+        backgrounds = self.scene_generator.get_assets_by_category("backgrounds")
+        self._background_item = None
+        if backgrounds:
+            size = self.scene_generator.proxy_size(self.resolution, self.proxy)
+            self._background_item = self._add_item("backgrounds", backgrounds[0], size=size)
+            self._background_item.setTransformOriginPoint(0, 0)
+            self._background_item.setScale(self.proxy)
+            self._background_item.setZValue(-1)
+
+        offsets, scales = [], []
+        for character in self._characters:
+            member = self._member(character)
+            item = member.get("item")
+            if item is not None and self._in_scene(item):
+                item.setTransformOriginPoint(item.boundingRect().center())
+                self._adopted.append(item)
+                scale = 1  # Already full resolution
+            else:
+                item = self._add_item(member["category"], member["name"])
+                scale = self.proxy
+            # Scaling a proxy item up about its centre shifts its top-left corner; compensate
+            # so it covers the same scene pixels as the full-resolution asset would
+            center = item.transformOriginPoint()
+            offsets.append((center.x() * (scale - 1), center.y() * (scale - 1)))
+            scales.append(scale)
+            self._items.append(item)
+        return np.array(offsets, dtype=float).reshape(-1, 2), np.array(scales, dtype=float)
+
+    def _add_item(self, category, name, size=None):
+        path = os.path.join(self.scene_generator.asset_library_path, category, name)
+        try:
+            image = self.scene_generator.asset_cache.get(path, size, reduce=self.proxy)
+            pixmap = QPixmap.fromImage(pil_to_qimage(image))
+        except OSError as e:
+            print(f"Warning: Could not load {path} - {e}")
+            pixmap = QPixmap()
+        item = QGraphicsPixmapItem(pixmap)
+        item.setTransformOriginPoint(pixmap.width() / 2, pixmap.height() / 2)
+        self.preview_scene.addItem(item)
+        return item
+
+    def _in_scene(self, item):
+        return not sip.isdeleted(item) and item.scene() is self.preview_scene
+
+    def _items_deleted(self):
+        # preview_scene.clear() (e.g. show_image) deletes our items behind our back
+        return any(not self._in_scene(item) for item in self._items)
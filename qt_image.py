@@ -0,0 +1,60 @@
+import io
+
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow built without littlecms
+    ImageCms = None
+
+_SRGB = None
+
+
+def to_srgb(img):
+    """Convert an image with an embedded ICC profile to sRGB in memory."""
+    global _SRGB
+    icc = img.info.get("icc_profile")
+    if not icc or ImageCms is None:
+        return img
+    # The output is always sRGB, so CMYK and greyscale sources become RGB; alpha is carried over separately
+    # when littlecms can't transform the mode with it (LA, PA)
+    alpha = img.getchannel("A") if img.mode in ("LA", "PA") else None
+    source = img.convert(img.mode[0]) if alpha is not None else img
+    try:
+        if _SRGB is None:
+            _SRGB = ImageCms.createProfile("sRGB")
+        converted = ImageCms.profileToProfile(source, ImageCms.ImageCmsProfile(io.BytesIO(icc)), _SRGB,
+                                              outputMode="RGBA" if source.mode == "RGBA" else "RGB")
+    except (ImageCms.PyCMSError, OSError, ValueError) as e:
+        print(f"Warning: Could not apply ICC profile - {e}")
+        return img
+    if alpha is not None:
+        converted.putalpha(alpha)
+    converted.info.pop("icc_profile", None)
+    return converted
+
+
+def pil_to_qimage(img):
+    """Convert a PIL image to a QImage over one copy of its pixel bytes (no second copy on the Qt side)."""
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if img.has_transparency_data else "RGB")
+    if img.mode == "RGBA":
+        data, fmt, stride = img.tobytes(), QImage.Format.Format_RGBA8888, img.width * 4
+    else:
+        data, fmt, stride = img.tobytes(), QImage.Format.Format_RGB888, img.width * 3
+    image = QImage(data, img.width, img.height, stride, fmt)
+    image._buffer = data  # QImage only references the bytes, so keep them alive with it
+    return image
+
+
+def load_qimage(path):
+    """Decode an image file once, colour-manage it in memory and return a QImage."""
+    with Image.open(path) as img:
+        img.load()
+        return pil_to_qimage(to_srgb(img))
+
+# Example Usage
+if __name__ == "__main__":
+    image = load_qimage("output/scenes/NewScene.png")
+    print(f"Loaded {image.width()}x{image.height()} {image.format()}")
@@ -0,0 +1,231 @@
+"""Headless renderer: parse -> generate -> mix -> export from the command line, without PyQt6.
+
+Every stage imports only what it needs inside its own function, so starting the
+tool (or running just "parse") never pays for NumPy, PIL, the audio stack or Qt.
+
+    python render_cli.py parse script.txt
+    python render_cli.py generate script.txt
+    python render_cli.py mix script.txt -o output/audio/final_audio.wav --tts espeak
+    python render_cli.py export script.txt -o output/episode.mp4 --fps 30 --workers 0
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def read_script(source):
+    if source == "-":
+        return sys.stdin.read()
+    with open(source, encoding="utf-8") as f:
+        return f.read()
+
+
+def parse(source, language='en'):
+    """Parse a script file ("-" for stdin) into commands, printing any parser errors as warnings."""
+    from script_parser import ScriptParser
+
+    parser = ScriptParser()
+    commands = parser.parse_script(read_script(source), language)
+    for error in parser.get_errors():
+        print(f"Warning: {error}", file=sys.stderr)
+    return commands
+
+
+def plan(commands):
+    """Expand parsed commands into the same scene, motion and audio jobs the batch renderer runs."""
+    from batch_renderer import expand_script
+
+    return expand_script(commands, "script")
+
+
+def generate(jobs, resolution=(1920, 1080), asset_library_path="assets"):
+    """Render a still for every scene in the script; returns the image paths."""
+    from scene_generator import SceneGenerator
+
+    generator = SceneGenerator(asset_library_path)
+    return [generator.generate_scene(job["name"], job["style"], resolution) for job in jobs if job["kind"] == "scene"]
+
+
+def narrate(jobs, language='en', tts_backend=None):
+    """Synthesize every narration line; returns {line: (audio file, length in seconds)}."""
+    from audio_graph import decode_audio
+    from speech_synthesis import EspeakBackend, SpeechSynthesizer
+
+    lines = list(dict.fromkeys(line for job in jobs if job["kind"] == "audio" for line in job["lines"]))
+    if not lines:
+        return {}
+    synthesizer = SpeechSynthesizer(EspeakBackend() if tts_backend == "espeak" else None)
+    clips = {}
+    for line, audio_file in zip(lines, synthesizer.synthesize_batch(lines, language)):
+        samples, rate = decode_audio(audio_file)
+        clips[line] = (audio_file, len(samples) / rate)
+    return clips
+
+
+def build_timeline(jobs, fps=30, clips=None):
+    """Lay the script out on a timeline, one scene after another.
+
+    Each character's motions play back to back from the start of their scene, and
+    a scene's narration lines play one after another from its start, each taking
+    its clip's length from clips (see narrate) or one motion length without them.
+    A scene ends when both its motion and its narration have finished. Returns the
+    TimelineEditor, the narration as (start seconds, line) pairs and the end time.
+    """
+    import numpy as np
+
+    from batch_renderer import MOTION_SECONDS
+    from motion_automation import MotionAutomation
+    from timeline_editor import TimelineEditor
+
+    timeline = TimelineEditor()
+    motion = MotionAutomation()
+    narration = []
+    scene_start = scene_end = 0.0
+    cursors = {}  # Character -> time their next motion starts in the current scene
+    for job in jobs:
+        if job["kind"] == "scene":
+            scene_start, cursors = scene_end, {}
+        elif job["kind"] == "motion":
+            start = cursors.get(job["actor"], scene_start)
+            samples = motion.sample_motion(job["motion"], job["duration"], fps)
+            timeline.add_keyframes(job["actor"], start + np.arange(len(samples)) / fps, [
+                {"position": (x, y), "scale": scale, "rotation": rotation}
+                for x, y, scale, rotation in samples.tolist()
+            ])
+            cursors[job["actor"]] = start + job["duration"]
+            scene_end = max(scene_end, cursors[job["actor"]])
+        elif job["kind"] == "audio":
+            start = scene_start
+            for line in job["lines"]:
+                narration.append((start, line))
+                start += clips[line][1] if clips else MOTION_SECONDS
+            scene_end = max(scene_end, start)
+    return timeline, narration, scene_end
+
+
+def mix(timeline, narration, clips, output_file, duration=None):
+    """Place the synthesized narration on the timeline's dialogue track and mix the soundtrack."""
+    from audio_mixer import TimelineMixer
+
+    for start, line in narration:
+        timeline.add_audio_cue(start, clips[line][0], track="dialogue")
+    return TimelineMixer().mix_timeline(timeline, output_file, duration)
+
+
+def export(timeline, output_file, style, resolution=(1920, 1080), fps=30, audio_file=None, proxy=1,
+           asset_library_path="assets", workers=1, duration=None):
+    """Composite every timeline frame and encode the video; workers > 1 shards frames across processes.
+
+    duration defaults to the last keyframe; pass a longer one to hold the final
+    pose while narration finishes.
+    """
+    from scene_generator import SceneGenerator
+    from video_exporter import VideoExporter
+
+    generator = SceneGenerator(asset_library_path)
+    duration = (timeline.get_duration() if duration is None else duration) + 1 / fps
+    size = generator.proxy_size(resolution, proxy)
+    if workers > 1:
+        from parallel_renderer import ParallelFrameRenderer
+
+        descriptions = generator.describe_timeline_frames(timeline, duration, fps, style, resolution)
+        frames = ParallelFrameRenderer(asset_library_path, workers, proxy=proxy).render(descriptions)
+    else:
+        # The exporter reads each frame before asking for the next, so the canvas can be reused
+        frames = generator.render_timeline_frames(timeline, duration, fps, style, resolution, proxy=proxy,
+                                                  reuse_frame=True)
+    return VideoExporter().export(frames, output_file, size, fps=fps, audio_file=audio_file,
+                                  frame_count=int(round(duration * fps)))
+
+
+def resolution_arg(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Render animation scripts without the GUI.")
+    stages = parser.add_subparsers(dest="stage", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("script", help="Script file, or - to read from stdin")
+    common.add_argument("--language", default="en")
+
+    parse_cmd = stages.add_parser("parse", parents=[common], help="Print the parsed script as JSON")
+    parse_cmd.add_argument("-o", "--output", help="Write JSON here instead of stdout")
+
+    render = argparse.ArgumentParser(add_help=False)
+    render.add_argument("--assets", default="assets", help="Asset library path")
+    render.add_argument("--resolution", type=resolution_arg, default=(1920, 1080))
+    render.add_argument("--fps", type=int, default=30)
+
+    audio = argparse.ArgumentParser(add_help=False)
+    audio.add_argument("--tts", choices=("gtts", "espeak"), default="gtts", help="Speech backend for narration")
+
+    stages.add_parser("generate", parents=[common, render], help="Render a still for every scene")
+
+    mix_cmd = stages.add_parser("mix", parents=[common, render, audio], help="Mix the narration soundtrack")
+    mix_cmd.add_argument("-o", "--output", default="output/audio/final_audio.wav")
+
+    export_cmd = stages.add_parser("export", parents=[common, render, audio], help="Render and encode the video")
+    export_cmd.add_argument("-o", "--output", default="output/video.mp4")
+    export_cmd.add_argument("--style", help="Override the style of the script's first scene")
+    export_cmd.add_argument("--proxy", type=int, default=1, help="Render at 1/N resolution")
+    export_cmd.add_argument("--workers", type=int, default=1,
+                            help="Render frames on N processes (0 for one per CPU)")
+    export_cmd.add_argument("--no-audio", action="store_true", help="Skip narration and export silent video")
+    export_cmd.add_argument("--audio-output", default="output/audio/final_audio.wav")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        commands = parse(args.script, args.language)
+        if args.stage == "parse":
+            text = json.dumps(commands, indent=2, ensure_ascii=False)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(text)
+            else:
+                print(text)
+            return 0
+
+        jobs = plan(commands)
+        if args.stage == "generate":
+            for path in generate(jobs, args.resolution, args.assets):
+                print(path)
+            return 0
+
+        # Narration lengths decide where lines and scenes start, so synthesize before laying out
+        with_audio = args.stage == "mix" or not args.no_audio
+        clips = narrate(jobs, args.language, args.tts) if with_audio else None
+        timeline, narration, end = build_timeline(jobs, args.fps, clips)
+        duration = max(timeline.get_duration(), end)
+        if args.stage == "mix":
+            print(mix(timeline, narration, clips, args.output, duration or None))
+            return 0
+
+        if not duration:
+            print("Error: The script has no motion or narration to render.", file=sys.stderr)
+            return 1
+        audio_file = None
+        if narration and clips:
+            audio_file = mix(timeline, narration, clips, args.audio_output, duration + 1 / args.fps)
+        style = args.style or next((job["style"] for job in jobs if job["kind"] == "scene"), "realistic")
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        workers = args.workers or os.cpu_count() or 1
+        export(timeline, args.output, style, args.resolution, args.fps, audio_file, args.proxy, args.assets, workers,
+               duration)
+        return 0
+    except (ImportError, OSError, RuntimeError, ValueError) as e:  # Missing optional backends included
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,170 @@
 from PIL import Image, ImageDraw
 import os
+import numpy as np
+
+from asset_cache import AssetCache
+from asset_index import AssetIndex
+from blend import composite, premultiply, unpremultiply
+from tiled_compositor import TiledCompositor
 
 class SceneGenerator:
-    def __init__(self, asset_library_path="assets"):
+    def __init__(self, asset_library_path="assets", cache_max_bytes=512 * 1024 * 1024, pixels_per_unit=100):
         self.asset_library_path = asset_library_path
+        self.pixels_per_unit = pixels_per_unit  # Motion path units -> scene pixels
+        self.asset_cache = AssetCache(cache_max_bytes)
         if not os.path.exists(self.asset_library_path):
             os.makedirs(self.asset_library_path)
+        self.asset_index = AssetIndex(self.asset_library_path)
 
     def get_assets_by_category(self, category):
         """Retrieve assets from a specific category in the library."""
-        category_path = os.path.join(self.asset_library_path, category)
-        if not os.path.exists(category_path):
-            return []
-        return [f for f in os.listdir(category_path) if f.endswith('.png') or f.endswith('.gif')]
+        self.asset_index.refresh([category])
+        return self.asset_index.list(category, ('.png', '.gif'))
 
     def list_all_assets(self):
         """List all assets in the library by category."""
-        categories = os.listdir(self.asset_library_path)
-        all_assets = {}
-        for category in categories:
-            category_path = os.path.join(self.asset_library_path, category)
-            if os.path.isdir(category_path):
-                all_assets[category] = self.get_assets_by_category(category)
-        return all_assets
+        self.asset_index.refresh()
+        return {category: self.asset_index.list(category, ('.png', '.gif'))
+                for category in self.asset_index.categories()}
     
-    def generate_scene(self, scene_name, style="realistic", resolution=(1920, 1080), layers=None):
+    def generate_scene(self, scene_name, style="realistic", resolution=(1920, 1080), layers=None, proxy=1):
         """Generate a layered scene and save it."""
         scene_dir = "output/scenes"
         os.makedirs(scene_dir, exist_ok=True)
 
-        # Select default background
-        backgrounds = self.get_assets_by_category("backgrounds")
-        bg_path = os.path.join(self.asset_library_path, "backgrounds", backgrounds[0]) if backgrounds else None
-
-        if bg_path and os.path.exists(bg_path):
-            base_scene = Image.open(bg_path).convert("RGBA")
-        else:
-            print("Warning: No background found. Using default color.")
-            base_scene = Image.new('RGBA', resolution, color=self._get_background_color(style))
-
-        # Add layers (Foreground, Midground, Background)
-        if layers:
-            for layer in layers:
-                layer_path = os.path.join(self.asset_library_path, layer['category'], layer['name'])
-                if os.path.exists(layer_path):
-                    layer_img = Image.open(layer_path).convert("RGBA")
-                    base_scene.paste(layer_img, layer.get("position", (0, 0)), mask=layer_img)
+        base_scene = self.compose_scene(style, resolution, layers, proxy=proxy)
 
         file_name = os.path.join(scene_dir, f"{scene_name.lower().replace(' ', '_')}_{style}.png")
         base_scene.save(file_name)
         return file_name
 
+    def compose_scene(self, style="realistic", resolution=(1920, 1080), layers=None, background=None,
+                      fit_background=False, as_array=False, proxy=1):
+        """Composite a layered scene in memory using cached asset decodes.
+
+        With proxy > 1 every asset and layer position is scaled down by that factor,
+        so a preview composites 1/proxy^2 of the pixels; resolution and layer
+        positions stay in full-resolution coordinates.
+        """
+        # Select default background
+        if background is None:
+            backgrounds = self.get_assets_by_category("backgrounds")
+            background = backgrounds[0] if backgrounds else None
+        bg_path = os.path.join(self.asset_library_path, "backgrounds", background) if background else None
+
+        if bg_path and os.path.exists(bg_path):
+            size = self.proxy_size(resolution, proxy) if fit_background else None
+            canvas = self.asset_cache.get_array(bg_path, size, reduce=proxy).copy()
+            base = self.asset_cache.get_array(bg_path, size, reduce=proxy, premultiplied=True)
+        else:
+            print("Warning: No background found. Using default color.")
+            canvas = np.array(Image.new('RGBA', self.proxy_size(resolution, proxy),
+                                        color=self._get_background_color(style)))
+            base = premultiply(canvas)
+
+        # Add layers (Foreground, Midground, Background) in one alpha-over pass
+        self.blend_into(canvas, base, self.place_layers(layers or [], proxy))
+
+        if as_array:
+            return canvas
+        return Image.fromarray(canvas, "RGBA")
+
+    def place_layers(self, layers, proxy=1):
+        """Resolve layer dicts to (premultiplied array, position, mode, opacity) for blend.composite.
+
+        Layers may set "mode" (normal, multiply, screen, add) and "opacity" (0-1).
+        """
+        placed = []
+        for layer in layers:
+            layer_path = os.path.join(self.asset_library_path, layer['category'], layer['name'])
+            if os.path.exists(layer_path):
+                placed.append((self.asset_cache.get_array(layer_path, reduce=proxy, premultiplied=True),
+                               self.to_proxy(layer.get("position", (0, 0)), proxy),
+                               layer.get("mode", "normal"), layer.get("opacity", 1.0)))
+        return placed
+
+    def blend_into(self, canvas, base, placed, region=None, workers=1):
+        """Blend placed layers into a straight-alpha canvas, reading what lies beneath from premultiplied base."""
+        for x0, y0, x1, y1 in composite(canvas, placed, source=base, region=region, workers=workers):
+            unpremultiply(canvas[y0:y1, x0:x1], out=canvas[y0:y1, x0:x1])
+
+    def describe_timeline_frames(self, timeline_editor, duration, fps=30, style="realistic",
+                                 resolution=(1920, 1080), cast=None, background=None, interpolation="linear",
+                                 static_layers=None):
+        """Yield a picklable scene description for every frame of the timeline.
+
+        Character layers are marked "dynamic"; static_layers (props, set dressing)
+        are drawn beneath them in every frame.
+        """
+        cast = cast or {}
+        static_layers = list(static_layers or [])
+        if background is None:
+            backgrounds = self.get_assets_by_category("backgrounds")
+            background = backgrounds[0] if backgrounds else None
+
+        frame_times, samples = timeline_editor.sample_timeline(0, duration, fps, interpolation)
+        tracks = []
+        for character, track in samples.items():
+            if np.isnan(track["x"]).all():
+                continue
+            member = cast.get(character, {"category": "characters", "name": f"{character}.png"})
+            anchor = member.get("position", (0, 0))
+            xs = np.rint(anchor[0] + track["x"] * self.pixels_per_unit)
+            ys = np.rint(anchor[1] - track["y"] * self.pixels_per_unit)
+            tracks.append((member, xs, ys))
+
+        for index in range(len(frame_times)):
+            layers = list(static_layers)
+            for member, xs, ys in tracks:
+                if np.isnan(xs[index]):
+                    continue
+                layers.append({"category": member["category"], "name": member["name"],
+                               "position": (int(xs[index]), int(ys[index])), "dynamic": True})
+            yield {"index": index, "style": style, "resolution": tuple(resolution),
+                   "background": background, "layers": layers}
+
+    def render_frame(self, description, proxy=1):
+        """Composite one frame from a scene description."""
+        return self.compose_scene(description["style"], description["resolution"], description["layers"],
+                                  background=description["background"], fit_background=True, proxy=proxy)
+
+    def render_timeline_frames(self, timeline_editor, duration, fps=30, style="realistic",
+                               resolution=(1920, 1080), cast=None, background=None, proxy=1, reuse_frame=False):
+        """Yield composited frames for the timeline without writing them to disk.
+
+        Frames are composited incrementally: only tiles touched by moving layers are
+        redrawn. With reuse_frame=True every frame is the same image updated in place,
+        which saves a full-frame copy when each frame is consumed before the next.
+        """
+        compositor = TiledCompositor(self, proxy=proxy)
+        for description in self.describe_timeline_frames(timeline_editor, duration, fps, style,
+                                                         resolution, cast, background):
+            yield compositor.render(description, copy=not reuse_frame)[0]
+
+    def proxy_size(self, resolution, proxy=1):
+        """Pixel size of a full-resolution canvas rendered at a proxy factor."""
+        return (-(-resolution[0] // proxy), -(-resolution[1] // proxy))
+
+    def to_proxy(self, position, proxy=1):
+        """Map a full-resolution pixel position onto a proxy canvas."""
+        return (int(position[0] // proxy), int(position[1] // proxy))
+
+    def motion_to_pixels(self, anchor, position):
+        """Map a motion path position (y up) to scene pixel coordinates (y down)."""
+        return (int(round(anchor[0] + position[0] * self.pixels_per_unit)),
+                int(round(anchor[1] - position[1] * self.pixels_per_unit)))
+
+    def cache_stats(self):
+        """Report decoded-asset cache hits, misses and bytes held."""
+        return self.asset_cache.stats()
 
     def add_layer(self, base_scene_path, layer_image_path, position=(0, 0)):
         """Add a layer (foreground or mid-ground) to the base scene."""
-        base_scene = Image.open(base_scene_path).convert("RGBA")
-        layer = Image.open(layer_image_path).convert("RGBA")
-        base_scene.paste(layer, position, mask=layer)
+        with Image.open(base_scene_path) as image:
+            canvas = np.array(image.convert("RGBA"))
+        layer = self.asset_cache.get_array(layer_image_path, premultiplied=True)
+        self.blend_into(canvas, premultiply(canvas), [(layer, tuple(position))])
+        base_scene = Image.fromarray(canvas, "RGBA")
 
         # Save the updated scene
         updated_scene_path = base_scene_path.replace(".png", "_with_layer.png")
@@ -75,7 +183,7 @@ class SceneGenerator:
 
     def get_assets(self):
         """List available assets from the asset library."""
-        return {category: self.get_assets_by_category(category) for category in os.listdir(self.asset_library_path) if os.path.isdir(os.path.join(self.asset_library_path, category))}
+        return self.list_all_assets()
 
     def add_asset_to_scene(self, base_scene_path, asset_category, asset_name, position=(0, 0)):
         """Add an asset from the library to the base scene."""
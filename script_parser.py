@@ -1,12 +1,154 @@
+import bisect
+import io
 import re
 import json
 
+# Precompiled command patterns, keyed by the keyword before the first colon
+SCENE_PATTERN = re.compile(r"Scene:\s*(.+)(\s*\((.+)\))?", re.IGNORECASE)
+CHARACTER_PATTERN = re.compile(r"Character:\s*(.+) enters from (.+)", re.IGNORECASE)
+ACTION_PATTERN = re.compile(r"Action:\s*(.+)(\s*->\s*Repeat (\d+) times)?", re.IGNORECASE)
+CONDITIONAL_PATTERN = re.compile(r"If:\s*(.+), then Action:\s*(.+)", re.IGNORECASE)
+SIMULTANEOUS_PATTERN = re.compile(r"Simultaneous:\s*(.+)", re.IGNORECASE)
+
+UNRECOGNIZED_ERROR = "Unrecognized command on line {number}: {line}"
+PROCESSING_ERROR = "Error processing line {number}: {line}. Error: {error}"
+METADATA_ERROR = "Malformed metadata: {item}"
+NO_ERRORS = ()  # Shared by error-free lines to avoid a list per line
+
 class ScriptParser:
     def __init__(self):
         self.commands = []
         self.errors = []
+        self.lines = []  # Source lines of the last parse_script call, for incremental updates
+        self.language = 'en'
+        self._line_results = []  # Per source line: (command or None, [(error template, fields)])
+        self._error_lines = []  # Sorted indices of lines that produced errors
+        self._dispatch = {
+            "scene": (SCENE_PATTERN, self._scene_command),
+            "character": (CHARACTER_PATTERN, self._character_command),
+            "action": (ACTION_PATTERN, self._action_command),
+            "if": (CONDITIONAL_PATTERN, self._conditional_command),
+            "simultaneous": (SIMULTANEOUS_PATTERN, self._simultaneous_command),
+        }
 
     def parse_script(self, script, language='en'):
+        """Parse a script written in natural language to identify scenes, characters, and actions."""
+        self.language = language
+        self.lines = script.split('\n')
+        self._line_results = [self._parse_line(line) for line in self.lines]
+        self._error_lines = [i for i, (_, errors) in enumerate(self._line_results) if errors]
+        self.commands = [command for command, _ in self._line_results if command is not None]
+        self._rebuild_errors()
+        return self.commands
+
+    def update_lines(self, start, end, new_lines):
+        """Replace source lines [start, end) (0-based) with new_lines, re-parsing only those lines.
+
+        The new commands and errors are spliced into the existing results. Returns the
+        range of changed command indices and the scene indices downstream consumers should
+        regenerate (every later scene too when scenes were added or removed).
+        """
+        if isinstance(new_lines, str):
+            new_lines = new_lines.split('\n')
+        if not 0 <= start <= end <= len(self.lines):
+            raise ValueError(f"Invalid line range {start}:{end} for a {len(self.lines)}-line script")
+
+        new_results = [self._parse_line(line) for line in new_lines]
+        old_results = self._line_results[start:end]
+        self.lines[start:end] = new_lines
+        self._line_results[start:end] = new_results
+
+        # Splice commands
+        first = sum(1 for command, _ in self._line_results[:start] if command is not None)
+        old_commands = [command for command, _ in old_results if command is not None]
+        new_commands = [command for command, _ in new_results if command is not None]
+        self.commands[first:first + len(old_commands)] = new_commands
+
+        # Splice error lines, shifting those after the edit
+        shift = len(new_lines) - (end - start)
+        lo, hi = bisect.bisect_left(self._error_lines, start), bisect.bisect_left(self._error_lines, end)
+        self._error_lines[lo:] = ([start + i for i, (_, errors) in enumerate(new_results) if errors]
+                                  + [index + shift for index in self._error_lines[hi:]])
+        self._rebuild_errors()
+
+        # Scenes are numbered by order of appearance; commands before the first scene belong to none
+        scene_count = sum(1 for command in self.commands if command["type"] == "scene")
+        first_scene = sum(1 for command in self.commands[:first] if command["type"] == "scene") - 1
+        old_scenes = sum(1 for command in old_commands if command["type"] == "scene")
+        new_scenes = sum(1 for command in new_commands if command["type"] == "scene")
+        last_scene = scene_count - 1 if old_scenes != new_scenes else first_scene + new_scenes
+        return {
+            "commands": range(first, first + len(new_commands)),
+            "removed_commands": len(old_commands),
+            "scenes": list(range(max(first_scene, 0), last_scene + 1)),
+        }
+
+    def iter_parse(self, source, language='en'):
+        """Parse a script string, file object or iterable of lines, yielding commands as they are found.
+
+        Commands are not accumulated, so arbitrarily long scripts parse in constant memory;
+        errors are still collected in self.errors.
+        """
+        self.errors = []
+        if isinstance(source, str):
+            source = io.StringIO(source)
+
+        for line_number, line in enumerate(source, start=1):
+            command, errors = self._parse_line(line, language)
+            for template, fields in errors:
+                self.errors.append(template.format(number=line_number, **fields))
+            if command is not None:
+                yield command
+
+    def _parse_line(self, line, language=None):
+        """Parse one source line into (command or None, [(error template, fields)])."""
+        language = language or self.language
+        if language != 'en':
+            line = self._translate_script(line, language)
+        line = line.strip()
+        if not line:
+            return None, NO_ERRORS
+
+        errors = []
+        try:
+            # Dispatch on the keyword prefix so each line tries at most one pattern
+            keyword = line.partition(':')[0].lower() if ':' in line else None
+            pattern, handler = self._dispatch.get(keyword, (None, None))
+            match = pattern.match(line) if pattern else None
+            if match:
+                command = handler(match, errors)
+                return command, errors or NO_ERRORS
+
+            # If no matches, add to errors
+            errors.append((UNRECOGNIZED_ERROR, {"line": line}))
+
+        except Exception as e:
+            errors.append((PROCESSING_ERROR, {"line": line, "error": str(e)}))
+        return None, errors
+
+    def _rebuild_errors(self):
+        self.errors = [template.format(number=index + 1, **fields)
+                       for index in self._error_lines
+                       for template, fields in self._line_results[index][1]]
+
+    def _scene_command(self, match, errors):
+        metadata = match.group(3) or ""
+        return {"type": "scene", "name": match.group(1).strip(), "metadata": self._parse_metadata(metadata, errors)}
+
+    def _character_command(self, match, errors):
+        return {"type": "character", "name": match.group(1).strip(), "action": "enter", "from": match.group(2).strip()}
+
+    def _action_command(self, match, errors):
+        repeat_count = int(match.group(3)) if match.group(3) else 1
+        return {"type": "action", "description": match.group(1).strip(), "repeat": repeat_count}
+
+    def _conditional_command(self, match, errors):
+        return {"type": "conditional_action", "condition": match.group(1).strip(), "action": match.group(2).strip()}
+
+    def _simultaneous_command(self, match, errors):
+        return {"type": "simultaneous", "actions": [a.strip() for a in match.group(1).split(',')]}
+
+    def parse_script_old(self, script, language='en'):
         """Parse a script written in natural language to identify scenes, characters, and actions."""
         self.commands = []
         self.errors = []
@@ -69,7 +211,7 @@ class ScriptParser:
 
         return self.commands
 
-    def _parse_metadata(self, metadata):
+    def _parse_metadata(self, metadata, errors=None):
         """Parse inline metadata in parentheses."""
         metadata_dict = {}
         if metadata:
@@ -79,7 +221,10 @@ class ScriptParser:
                     key, value = map(str.strip, item.split(':'))
                     metadata_dict[key.lower()] = value
                 except ValueError:
-                    self.errors.append(f"Malformed metadata: {item}")
+                    if errors is None:
+                        self.errors.append(METADATA_ERROR.format(item=item))
+                    else:
+                        errors.append((METADATA_ERROR, {"item": item}))
         return metadata_dict
 
     def _translate_script(self, script, language):
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class GTTSBackend:
+    name = "gtts"
+    extension = "mp3"
+
+    def synthesize(self, text, language, accent, output_file):
+        from gtts import gTTS
+
+        tts = gTTS(text=text, lang=language, tld=accent if accent else "com")
+        tts.save(output_file)
+
+
+class EspeakBackend:
+    """Offline stand-in for gTTS using a local espeak-ng/espeak install."""
+    name = "espeak"
+    extension = "wav"
+
+    def __init__(self, executable=None):
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.executable:
+            raise FileNotFoundError("espeak-ng or espeak is required for the offline TTS backend.")
+
+    def synthesize(self, text, language, accent, output_file):
+        voice = f"{language}-{accent}" if accent else language
+        subprocess.run([self.executable, "-v", voice, "-w", output_file, "--stdin"],
+                       input=text.encode("utf-8"), check=True, capture_output=True)
+
+
+class SpeechSynthesizer:
+    def __init__(self, backend=None, cache_dir="output/tts_cache", max_workers=4):
+        self.backend = backend or GTTSBackend()
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def cache_path(self, text, language='en', accent=None):
+        """Content-addressed cache location for a line of speech."""
+        key = json.dumps([text, language, accent, self.backend.name], ensure_ascii=False)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{self.backend.extension}")
+
+    def synthesize(self, text, language='en', accent=None):
+        """Return the cached audio file for a line, synthesizing it only if it is not cached yet."""
+        path = self.cache_path(text, language, accent)
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+
+        with self._lock_for(path):
+            if os.path.exists(path):  # Another thread synthesized it while we waited
+                self.hits += 1
+                return path
+            self.misses += 1
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=f".{self.backend.extension}", dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                self.backend.synthesize(text, language, accent, temp_path)
+                os.replace(temp_path, path)  # Atomic, so readers never see a partial file
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return path
+
+    def synthesize_batch(self, lines, language='en', accent=None):
+        """Synthesize many lines concurrently; items are strings or dicts with text/language/accent."""
+        requests = []
+        for line in lines:
+            if isinstance(line, str):
+                requests.append((line, language, accent))
+            else:
+                requests.append((line["text"], line.get("language", language), line.get("accent", accent)))
+
+        unique = list(dict.fromkeys(requests))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            paths = dict(zip(unique, pool.map(lambda request: self.synthesize(*request), unique)))
+        return [paths[request] for request in requests]
+
+    def _lock_for(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "backend": self.backend.name}
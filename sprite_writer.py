@@ -0,0 +1,85 @@
+import math
+import os
+
+from PIL import Image, ImageColor, ImageDraw, features
+
+BACKGROUND, SPRITE, MARKER = 0, 1, 2  # Palette indices
+
+
+class SpriteAnimationWriter:
+    _palettes = {}  # Shared across writers: (background, sprite, marker) -> palette
+
+    def __init__(self, image_size=(400, 400), background="white", color="blue", marker="navy",
+                 radius=20, duration=50):
+        self.image_size = tuple(image_size)
+        self.radius = radius
+        self.duration = duration
+        self.palette = self._get_palette(background, color, marker)
+
+        # One paletted canvas reused for every frame; no per-frame quantization needed
+        self.canvas = Image.new("P", self.image_size, BACKGROUND)
+        self.canvas.putpalette(self.palette)
+        self.draw = ImageDraw.Draw(self.canvas)
+        self._dirty = None
+
+    @classmethod
+    def _get_palette(cls, *colors):
+        palette = cls._palettes.get(colors)
+        if palette is None:
+            palette = [channel for color in colors for channel in ImageColor.getrgb(color)[:3]]
+            cls._palettes[colors] = palette
+        return palette
+
+    def render(self, scale=1.0, rotation=0.0):
+        """Draw one sprite pose on the shared canvas, clearing only what the previous pose touched."""
+        if self._dirty:
+            self.draw.rectangle(self._dirty, fill=BACKGROUND)
+
+        cx, cy = self.image_size[0] // 2, self.image_size[1] // 2
+        r = max(int(self.radius * abs(scale)), 1)
+        self.draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=SPRITE)
+
+        # Facing marker so rotation is visible on the round sprite
+        angle = math.radians(rotation)
+        mx, my = cx + 0.6 * r * math.cos(angle), cy - 0.6 * r * math.sin(angle)
+        m = max(r // 5, 1)
+        self.draw.ellipse((mx - m, my - m, mx + m, my + m), fill=MARKER)
+
+        self._dirty = (cx - r, cy - r, cx + r, cy + r)
+        return self.canvas
+
+    def write(self, poses, output_file, format=None):
+        """Render (scale, rotation) poses and save them as a GIF, APNG or WebP animation."""
+        frames = [self.render(scale, rotation).copy() for scale, rotation in poses]
+        return self.save_frames(frames, output_file, format)
+
+    def save_frames(self, frames, output_file, format=None):
+        """Save paletted frames; unchanged regions are skipped by the encoder's frame differencing."""
+        frames = list(frames)
+        format = (format or os.path.splitext(output_file)[1].lstrip(".") or "gif").lower()
+        if format == "gif":
+            # Frames already share one palette, so Pillow only diffs and crops them
+            frames[0].save(output_file, save_all=True, append_images=frames[1:], duration=self.duration,
+                           loop=0, disposal=1, optimize=False)
+        elif format in ("png", "apng"):
+            frames[0].save(output_file, format="PNG", save_all=True, append_images=frames[1:],
+                           duration=self.duration, loop=0)
+        elif format == "webp":
+            if not features.check("webp"):
+                raise ValueError("This Pillow build has no WebP support.")
+            frames = [frame.convert("RGB") for frame in frames]
+            frames[0].save(output_file, format="WEBP", save_all=True, append_images=frames[1:],
+                           duration=self.duration, loop=0, lossless=True)
+        else:
+            raise ValueError(f"Unsupported sprite format: {format}")
+        return output_file
+
+# Example Usage
+if __name__ == "__main__":
+    from motion_automation import MotionAutomation
+
+    os.makedirs("output/motion", exist_ok=True)
+    samples = MotionAutomation().sample_motion("scale", duration=2, fps=20)
+    writer = SpriteAnimationWriter()
+    poses = zip(samples["scale"], samples["rotation"])
+    print(writer.write(poses, "output/motion/sprite_scale.gif"))
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from asset_index import file_sha1
+
+
+class ThumbnailCache:
+    """Downscaled asset previews stored on disk, keyed by the source's content hash."""
+
+    def __init__(self, cache_dir="output/thumbnails", size=(128, 128), max_workers=4):
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.hits = 0
+        self.misses = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnails")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, digest):
+        width, height = self.size
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{width}x{height}.png")
+
+    def get(self, source, digest=None):
+        """Return the thumbnail file for source, generating it if it is not cached yet."""
+        path = self.path_for(digest or file_sha1(source))
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        with Image.open(source) as img:
+            img.draft("RGB", self.size)  # Lets JPEGs decode at a fraction of full size
+            img.thumbnail(self.size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                img.save(temp_path, "PNG")
+                os.replace(temp_path, path)  # Atomic, so concurrent readers never see a partial file
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return path
+
+    def submit(self, source, digest=None):
+        """Generate a thumbnail in the background; returns a Future for its path."""
+        return self._pool.submit(self.get, source, digest)
+
+    def execute(self, fn, *args):
+        """Run other slow asset I/O (such as an index refresh) on the thumbnail workers."""
+        return self._pool.submit(fn, *args)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": self.size}
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+# Example Usage
+if __name__ == "__main__":
+    thumbnails = ThumbnailCache()
+    print(f"Thumbnail: {thumbnails.get('assets/backgrounds/forest.png')}")
+    print(thumbnails.stats())
@@ -1,30 +1,101 @@
-import matplotlib.pyplot as plt
+import numpy as np
 from collections import defaultdict
 
-from motion_automation import MotionAutomation
+from command_journal import (
+    AddEvent, CommandJournal, GroupEvents, MoveEvent, MoveKeyframe, RemoveEvent, UngroupEvents
+)
+from keyframe_store import KeyframeStore, KeyframeTrack
 
 class TimelineEditor:
     def __init__(self):
-        self.timeline = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self.events = KeyframeTrack()
+        self.journal = CommandJournal()
         self.event_groups = defaultdict(list)
-        self.keyframes = defaultdict(list)
+        self.keyframes = KeyframeStore()
+        self.audio_cues = KeyframeTrack()
+
+    @property
+    def timeline(self):
+        """All timeline events as a sorted list of dicts."""
+        return self.events.to_list()
 
     def add_keyframe(self, timestamp, event, character):
         """Add a keyframe for animation control."""
-        self.keyframes[character].append({"timestamp": timestamp, "event": event})
-        self.keyframes[character] = sorted(self.keyframes[character], key=lambda x: x["timestamp"])
+        self.keyframes.add(character, timestamp, event)
+
+    def add_keyframes(self, character, timestamps, events):
+        """Bulk-insert keyframes for a character."""
+        self.keyframes.bulk_add(character, timestamps, events)
+
+    def set_keyframes(self, character, timestamps, events):
+        """Replace all of a character's keyframes."""
+        self.keyframes.replace(character, timestamps, events)
 
     def get_keyframes(self, character):
         """Retrieve keyframes for a character."""
-        return self.keyframes.get(character, [])
+        return self.keyframes.get(character)
+
+    def get_keyframes_in_range(self, start, end, characters=None):
+        """Retrieve each character's keyframes between start and end."""
+        return self.keyframes.range(start, end, characters)
+
+    def get_active_keyframes(self, timestamp):
+        """Retrieve the keyframe in effect at a timestamp for every character."""
+        return self.keyframes.active_at(timestamp)
+
+    def on_keyframes_changed(self, callback):
+        """Call callback(character, start, end) after every keyframe edit, including undo/redo."""
+        self.keyframes.listeners.append(callback)
+
+    def sample_timeline(self, start, end, fps=30, interpolation="linear", characters=None):
+        """Sample every character's keyframes at a frame rate.
+
+        Frames cover [start, end); returns the frame times and a dict of per-character
+        structured arrays with x, y, scale and rotation per frame.
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        frame_count = max(int(round((end - start) * fps)), 0)
+        frame_times = start + np.arange(frame_count) / fps
+        return frame_times, self.keyframes.sample(frame_times, interpolation, characters)
+
+    def add_audio_cue(self, timestamp, audio_file, track="dialogue", gain_db=0, fade_in=0, fade_out=0,
+                      loop=False, duration=None):
+        """Place an audio clip (dialogue, SFX or music) on the timeline; times are in seconds."""
+        self.audio_cues.add(timestamp, {"file": audio_file, "track": track, "gain_db": gain_db,
+                                        "fade_in": fade_in, "fade_out": fade_out, "loop": loop,
+                                        "duration": duration})
+
+    def get_audio_cues(self, track=None):
+        """Retrieve audio cues in start order, optionally for one track."""
+        return [dict(cue["event"], start=cue["timestamp"]) for cue in self.audio_cues
+                if track is None or cue["event"]["track"] == track]
+
+    def get_events_in_range(self, start, end):
+        """Retrieve timeline events between start and end."""
+        return self.events.range(start, end)
+
+    def get_duration(self):
+        """Return the timestamp of the last keyframe or event."""
+        return max(self.keyframes.end_time(), self.events.end_time())
+
+    def sync_with_motion(self, motion_type, character, duration, fps=None, replace=False):
+        """Auto-generate keyframes based on motion type; replace=True swaps out the character's existing keyframes."""
+        from motion_automation import MotionAutomation
+
+        store = self.set_keyframes if replace else self.add_keyframes
+        if fps:
+            samples = MotionAutomation().sample_motion(motion_type, duration, fps)
+            timestamps = np.arange(len(samples)) / fps
+            store(character, timestamps, [
+                {"position": (x, y), "scale": scale, "rotation": rotation}
+                for x, y, scale, rotation in samples.tolist()
+            ])
+            return
 
-    def sync_with_motion(self, motion_type, character, duration):
-        """Auto-generate keyframes based on motion type."""
         positions = MotionAutomation().apply_motion(character, motion_type, duration, save_as_gif=False)
-        for i, pos in enumerate(positions):
-            self.add_keyframe(i * (duration / len(positions)), {"position": pos}, character)
+        timestamps = [i * (duration / len(positions)) for i in range(len(positions))]
+        store(character, timestamps, [{"position": pos} for pos in positions])
 
     def display_timeline(self):
         """Display all timeline events."""
@@ -35,84 +106,56 @@ class TimelineEditor:
                 
     def add_event(self, timestamp, event, group=None):
         """Add an event to the timeline."""
-        self.undo_stack.append(("remove", timestamp, event, group))
-        self.redo_stack.clear()
-        self.timeline.append({"timestamp": timestamp, "event": event})
-        self.timeline.sort(key=lambda x: x['timestamp'])  # Keep events in order
-        if group:
-            self.event_groups[group].append({"timestamp": timestamp, "event": event})
-        self.timeline.sort(key=lambda x: x['timestamp'])
+        self.journal.execute(self, AddEvent(timestamp, event, group))
 
     def remove_event(self, timestamp):
         """Remove an event from the timeline by timestamp."""
-        for event in self.timeline:
-            if event["timestamp"] == timestamp:
-                self.undo_stack.append(("add", event["timestamp"], event["event"], None))
-                self.redo_stack.clear()
-                self.timeline.remove(event)
-                break
+        index = self.events.find(timestamp)
+        if index is not None:
+            self.journal.execute(self, RemoveEvent(timestamp, self.events.events[index]))
+
+    def move_event(self, timestamp, new_timestamp):
+        """Move an event to a new timestamp; consecutive nudges undo as one step."""
+        index = self.events.find(timestamp)
+        if index is not None:
+            self.journal.execute(self, MoveEvent(timestamp, new_timestamp, self.events.events[index]))
+
+    def move_keyframe(self, character, timestamp, new_timestamp):
+        """Drag a character keyframe to a new timestamp; consecutive drags undo as one step."""
+        track = self.keyframes.track(character)
+        index = track.find(timestamp)
+        if index is not None:
+            self.journal.execute(self, MoveKeyframe(character, timestamp, new_timestamp, track.events[index]))
 
     def group_events(self, group_name, events):
         """Group related events together for better organization."""
-        self.undo_stack.append(("ungroup", group_name, events))
-        self.redo_stack.clear()
-        for event in events:
-            self.event_groups[group_name].append(event)
+        self.journal.execute(self, GroupEvents(group_name, events))
 
     def ungroup_events(self, group_name):
         """Remove a group from the timeline."""
         if group_name in self.event_groups:
-            events = self.event_groups.pop(group_name)
-            self.undo_stack.append(("group", group_name, events))
-            self.redo_stack.clear()
+            self.journal.execute(self, UngroupEvents(group_name, self.event_groups[group_name]))
 
     def undo(self):
         """Undo the last action."""
-        if not self.undo_stack:
+        if self.journal.undo(self) is None:
             print("No actions to undo.")
-            return
-
-        action = self.undo_stack.pop()
-        self.redo_stack.append(action)
-
-        if action[0] == "remove":
-            self.timeline.append({"timestamp": action[1], "event": action[2]})
-        elif action[0] == "add":
-            self.timeline = [e for e in self.timeline if e["timestamp"] != action[1]]
-        elif action[0] == "ungroup":
-            for event in action[2]:
-                self.event_groups[action[1]].remove(event)
-        elif action[0] == "group":
-            self.event_groups[action[1]] = action[2]
 
     def redo(self):
         """Redo the last undone action."""
-        if not self.redo_stack:
+        if self.journal.redo(self) is None:
             print("No actions to redo.")
-            return
-
-        action = self.redo_stack.pop()
-        self.undo_stack.append(action)
-
-        if action[0] == "remove":
-            self.timeline = [e for e in self.timeline if e["timestamp"] != action[1]]
-        elif action[0] == "add":
-            self.timeline.append({"timestamp": action[1], "event": action[2]})
-        elif action[0] == "ungroup":
-            self.event_groups[action[1]] = action[2]
-        elif action[0] == "group":
-            for event in action[2]:
-                self.event_groups[action[1]].append(event)
 
     def display_timeline(self, zoom_start=None, zoom_end=None):
         """Display the timeline with optional zoom levels."""
-        timestamps = [event["timestamp"] for event in self.timeline]
-        events = [event["event"] for event in self.timeline]
-
         if zoom_start is not None and zoom_end is not None:
-            filtered_indices = [i for i, t in enumerate(timestamps) if zoom_start <= t <= zoom_end]
-            timestamps = [timestamps[i] for i in filtered_indices]
-            events = [events[i] for i in filtered_indices]
+            visible = self.events.range(zoom_start, zoom_end)
+        else:
+            visible = self.timeline
+        timestamps = [event["timestamp"] for event in visible]
+        events = [event["event"] for event in visible]
+
+        import matplotlib.pyplot as plt
 
         plt.figure(figsize=(10, 2))
         plt.scatter(timestamps, [1] * len(timestamps), c='b')
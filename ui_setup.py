@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGraphicsView,
-    QGraphicsScene, QListWidget, QFrame, QSplitter, QSizePolicy, QMenuBar
+    QGraphicsScene, QListWidget, QFrame, QSplitter, QSizePolicy, QMenuBar, QSlider
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPixmap, QImage, QIcon, QAction
@@ -49,9 +49,19 @@ def setup_ui(self):
     preview_splitter = QSplitter()
     preview_splitter.addWidget(self.preview_view)
 
+    self.fps_label = QLabel("0.0 fps")
+
+    # Scrub bar in milliseconds; its range follows the timeline's duration
+    self.scrub_slider = QSlider(Qt.Orientation.Horizontal)
+    self.scrub_slider.setRange(0, 0)
+    self.scrub_slider.valueChanged.connect(self.scrub)
+    self.scrub_slider.sliderReleased.connect(self.scrub_released)
+
     center_panel = QVBoxLayout()
     center_panel.addWidget(QLabel("Animation Preview"))
     center_panel.addWidget(preview_splitter)
+    center_panel.addWidget(self.scrub_slider)
+    center_panel.addWidget(self.fps_label)
 
     center_frame = QFrame()
     center_frame.setLayout(center_panel)
@@ -0,0 +1,118 @@
+import queue
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+
+class VideoExporter:
+    def __init__(self, ffmpeg_path="ffmpeg", queue_size=8, codec="libx264", pix_fmt="yuv420p"):
+        self.ffmpeg_path = ffmpeg_path
+        self.queue_size = queue_size  # Frames buffered between the renderer and ffmpeg
+        self.codec = codec
+        self.pix_fmt = pix_fmt
+
+    def export(self, frames, output_file, resolution, fps=30, audio_file=None, frame_count=None, progress=None):
+        """Pipe raw frames (PIL images or arrays) straight into an ffmpeg encoder."""
+        progress = progress or self._print_progress
+        frames = iter(frames)
+        try:
+            first = self._frame_bytes(next(frames), resolution)
+        except StopIteration:
+            raise ValueError("No frames to export.")
+
+        process = subprocess.Popen(self._build_command(output_file, resolution, fps, first[1], audio_file),
+                                   stdin=subprocess.PIPE)
+        buffer = queue.Queue(maxsize=self.queue_size)
+        state = {"written": 0, "error": None}
+        started = time.perf_counter()
+
+        def write_frames():
+            while True:
+                data = buffer.get()
+                if data is None:
+                    break
+                if state["error"] is not None:
+                    continue
+                try:
+                    process.stdin.write(data)
+                except (BrokenPipeError, OSError) as e:
+                    state["error"] = e
+                    continue
+                state["written"] += 1
+                elapsed = time.perf_counter() - started
+                progress(state["written"], frame_count, state["written"] / elapsed if elapsed else 0.0)
+
+        writer = threading.Thread(target=write_frames, daemon=True)
+        writer.start()
+        try:
+            # put() blocks while the queue is full, so a slow encoder throttles rendering
+            buffer.put(first[0])
+            for frame in frames:
+                if state["error"] is not None:
+                    break
+                buffer.put(self._frame_bytes(frame, resolution, first[1])[0])
+        finally:
+            buffer.put(None)
+            writer.join()
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            return_code = process.wait()
+
+        if state["error"] is not None or return_code != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {return_code}: {state['error']}")
+        print(f"Video exported: {output_file} ({state['written']} frames)")
+        return output_file
+
+    def _build_command(self, output_file, resolution, fps, input_format, audio_file):
+        command = [
+            self.ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", input_format,
+            "-s", f"{resolution[0]}x{resolution[1]}", "-r", str(fps), "-i", "-",
+        ]
+        if audio_file:
+            command += ["-i", audio_file, "-c:a", "aac", "-shortest"]
+        command += ["-c:v", self.codec, "-pix_fmt", self.pix_fmt, output_file]
+        return command
+
+    def _frame_bytes(self, frame, resolution, input_format=None):
+        """Return the raw pixel bytes of a frame and its ffmpeg pixel format."""
+        if isinstance(frame, np.ndarray):
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            data = np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+        else:
+            if frame.mode not in ("RGB", "RGBA"):
+                frame = frame.convert("RGBA")
+            width, height = frame.size
+            channels = len(frame.getbands())
+            data = frame.tobytes()
+
+        if (width, height) != tuple(resolution):
+            raise ValueError(f"Frame size {width}x{height} does not match export resolution "
+                             f"{resolution[0]}x{resolution[1]}.")
+        frame_format = {3: "rgb24", 4: "rgba"}.get(channels)
+        if frame_format is None or (input_format and frame_format != input_format):
+            raise ValueError(f"Unsupported frame layout with {channels} channels.")
+        return data, frame_format
+
+    def _print_progress(self, written, total, fps):
+        if written % 30 == 0 or written == total:
+            total_text = f"/{total}" if total else ""
+            print(f"Exported frame {written}{total_text} ({fps:.1f} fps)")
+
+# Example Usage
+if __name__ == "__main__":
+    from scene_generator import SceneGenerator
+    from timeline_editor import TimelineEditor
+
+    generator = SceneGenerator()
+    timeline = TimelineEditor()
+    timeline.sync_with_motion("walk", "Character1", duration=2)
+
+    # The exporter reads each frame before asking for the next, so the canvas can be reused
+    frames = generator.render_timeline_frames(timeline, duration=2, fps=30, style="cartoon", reuse_frame=True)
+    VideoExporter().export(frames, "output/timeline.mp4", (1920, 1080), fps=30, frame_count=60)